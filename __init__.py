@@ -199,12 +199,33 @@ def _ensure_scene_pointer():
     bpy.types.Scene.m1dc_project = bpy.props.PointerProperty(type=M1DCSettings)
 
 
+# (handler list name, callback): inspector stats are kept in memory and only
+# serialized to the scene when the .blend is saved
+_APP_HANDLERS = (
+    ("save_pre", ops._flush_inspector_stats),
+    ("load_post", ops._reset_inspector_stats),
+)
+
+
 def register():
     auto_load.register(ORDERED_CLASSES)
     _ensure_scene_pointer()
+    for name, fn in _APP_HANDLERS:
+        handlers = getattr(bpy.app.handlers, name)
+        if fn not in handlers:
+            handlers.append(bpy.app.handlers.persistent(fn))
 
 
 def unregister():
+    for name, fn in _APP_HANDLERS:
+        handlers = getattr(bpy.app.handlers, name)
+        if fn in handlers:
+            handlers.remove(fn)
+    # Persist in-memory inspector stats so an add-on reload still shows them
+    try:
+        ops._flush_inspector_stats()
+    except Exception:
+        pass
     if hasattr(bpy.types.Scene, "m1dc_settings"):
         del bpy.types.Scene.m1dc_settings
     if hasattr(bpy.types.Scene, "m1dc_project"):
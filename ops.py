@@ -1,12 +1,23 @@
 import os
 import re
+import sys
 import json
 import sqlite3
+import stat
 import csv
+import functools
+import itertools
 import math
+import operator
+import queue
+import atexit
+import threading
+from collections import Counter, defaultdict
+from contextlib import ExitStack, closing, contextmanager
 from datetime import datetime
 from pathlib import Path
 import bmesh
+import numpy as np
 
 # ============================================================================
 # OPERATOR POLL: Enforce phase dependencies (example: DC_OT_LoadTerrain)
@@ -34,6 +45,50 @@ def _get_sync_error():
     return _spreadsheet_sync_error
 
 
+# Raw stats dict from the last SQL query, per scene ({scene.session_uid: stats}). JSON is
+# only built when it has to persist: _flush_inspector_stats runs on save and add-on unload.
+_inspector_stats = {}
+
+
+def _set_inspector_stats(s, stats):
+    """Store query stats for s's scene as a raw dict; supersedes inspector_query_last_stats_json."""
+    key = s.id_data.session_uid
+    if stats is None:
+        _inspector_stats.pop(key, None)
+    else:
+        _inspector_stats[key] = stats
+        s.inspector_query_last_stats_json = ""
+
+
+def _get_inspector_stats(s):
+    """Return last query stats as dict (ephemeral cache first, persisted JSON fallback)."""
+    stats = _inspector_stats.get(s.id_data.session_uid)
+    if stats is not None:
+        return stats
+    stats_json = getattr(s, "inspector_query_last_stats_json", "")
+    if not stats_json:
+        return None
+    try:
+        return json.loads(stats_json)
+    except Exception:
+        return None
+
+
+def _flush_inspector_stats(*_args):
+    """Write cached stats into inspector_query_last_stats_json (save_pre handler / unregister)."""
+    import bpy
+    for scene in bpy.data.scenes:
+        stats = _inspector_stats.get(scene.session_uid)
+        s = getattr(scene, "m1dc_settings", None)
+        if stats is not None and s is not None:
+            s.inspector_query_last_stats_json = json.dumps(stats)
+
+
+def _reset_inspector_stats(*_args):
+    """Drop cached stats when a .blend is loaded (load_post handler); persisted JSON takes over."""
+    _inspector_stats.clear()
+
+
 # ============================================================================
 
 try:
@@ -47,6 +102,8 @@ try:
         get_output_dir,
         link_exclusively_to_collection,
         get_scene_crs,
+        resolve_gpkg_path,
+        log_gpkg_resolution,
         # Database readonly access
         open_db_readonly,
         ensure_readonly_copy,
@@ -61,6 +118,8 @@ except Exception as e:  # fallback if common fails to expose get_output_dir duri
         bbox_iou_xy,
         link_exclusively_to_collection,
         get_scene_crs,
+        resolve_gpkg_path,
+        log_gpkg_resolution,
     )
     # Fallback DB functions if import fails
     open_db_readonly = None
@@ -72,6 +131,12 @@ try:
 except ImportError:
     scale_and_place_terrain_pair = None
 
+# Optional C JSON encoder for spreadsheet attrs_json (not bundled with Blender)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Import terrain world calibration module
 try:
     from .pipeline.terrain.terrain_world_calibration import calibrate_terrain_to_world_bounds, bbox_size_xy_world
@@ -193,27 +258,41 @@ def _count_files(folder, exts):
     return count
 
 
-def _first_table_in_gpkg(gpkg_path):
+@functools.lru_cache(maxsize=32)
+def _resolve_gpkg_cached(raw_path, _sig):
+    return resolve_gpkg_path(raw_path)
+
+
+def _resolved_gpkg(gpkg_path, log_prefix=None):
+    """resolve_gpkg_path() memoized per raw path; returns resolved or the raw path.
+
+    Keyed on the raw path's mtime so a directory that gains a *_READONLY.gpkg
+    re-resolves. log_gpkg_resolution() runs only when an entry is first computed.
+    """
+    raw = str(gpkg_path or "")
     try:
-        from .utils.common import resolve_gpkg_path
-        resolved, _ = resolve_gpkg_path(gpkg_path)
-        gpkg_path = resolved or gpkg_path
+        sig = os.stat(raw).st_mtime_ns if raw else None
+    except OSError:
+        sig = None
+    try:
+        misses = _resolve_gpkg_cached.cache_info().misses
+        resolved, info = _resolve_gpkg_cached(raw, sig)
+        if log_prefix and _resolve_gpkg_cached.cache_info().misses != misses:
+            log_gpkg_resolution(gpkg_path, resolved, info, prefix=log_prefix)
     except Exception:
-        pass
+        return gpkg_path
+    return resolved or gpkg_path
+
+
+def _first_table_in_gpkg(gpkg_path):
+    gpkg_path = _resolved_gpkg(gpkg_path)
     if not gpkg_path or not os.path.isfile(gpkg_path):
         return ""
     try:
-        # Use centralized readonly DB access
-        if open_db_readonly:
-            con = open_db_readonly(gpkg_path, log_open=False)
-        else:
-            # Fallback if import failed
-            uri = f"file:{Path(gpkg_path).as_posix()}?mode=ro"
-            con = sqlite3.connect(uri, uri=True)
-        cur = con.cursor()
-        cur.execute("SELECT table_name FROM gpkg_contents ORDER BY table_name;")
-        rows = cur.fetchall()
-        con.close()
+        with _ro_conn(gpkg_path) as con:
+            cur = con.cursor()
+            cur.execute("SELECT table_name FROM gpkg_contents ORDER BY table_name;")
+            rows = cur.fetchall()
         return rows[0][0] if rows else ""
     except Exception:
         return ""
@@ -257,8 +336,8 @@ from .pipeline.linking.key_normalization import normalize_source_tile
 
 
 def norm_source_tile(v) -> str:
-    """Thin wrapper delegating to the canonical normalize_source_tile."""
-    return normalize_source_tile(v)
+    """Thin wrapper delegating to the canonical normalize_source_tile (interned: used as dict key)."""
+    return sys.intern(normalize_source_tile(v))
 
 
 def _norm_source_tile(x: str) -> str:
@@ -400,50 +479,37 @@ def _detect_feature_table(gpkg_path):
     """Pick a feature table that has an osm_id column.
     Priority: FEATURE_TABLE_FALLBACK if present with osm_id, else first table containing osm_id.
     """
-    try:
-        from .utils.common import resolve_gpkg_path
-        resolved, _ = resolve_gpkg_path(gpkg_path)
-        gpkg_path = resolved or gpkg_path
-    except Exception:
-        pass
+    gpkg_path = _resolved_gpkg(gpkg_path)
     if not gpkg_path or not os.path.isfile(gpkg_path):
         return "", []
     try:
-        if open_db_readonly:
-            con = open_db_readonly(gpkg_path, log_open=False)
-        else:
-            uri = f"file:{Path(gpkg_path).as_posix()}?mode=ro"
-            con = sqlite3.connect(uri, uri=True)
-        cur = con.cursor()
-
-        def table_cols(table_name):
-            t_sane = _sanitize_identifier(table_name)
-            rows = cur.execute(f'PRAGMA table_info("{t_sane}");').fetchall()
-            return [row[1] for row in rows]
-
-        # fallback table first
-        candidate_tables = []
-        rows = cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'rtree_%';").fetchall()
-        for r in rows:
-            name = str(r[0])
-            candidate_tables.append(name)
-
-        chosen = ""
-        cols = []
-        if FEATURE_TABLE_FALLBACK in candidate_tables:
-            cols = table_cols(FEATURE_TABLE_FALLBACK)
-            if "osm_id" in cols:
-                chosen = FEATURE_TABLE_FALLBACK
-        if not chosen:
-            for tbl in candidate_tables:
-                cols = table_cols(tbl)
+        with _ro_conn(gpkg_path) as con:
+            cur = con.cursor()
+
+            def table_cols(table_name):
+                t_sane = _sanitize_identifier(table_name)
+                rows = cur.execute(f'PRAGMA table_info("{t_sane}");').fetchall()
+                return [row[1] for row in rows]
+
+            # fallback table first
+            candidate_tables = []
+            rows = cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'rtree_%';").fetchall()
+            for r in rows:
+                name = str(r[0])
+                candidate_tables.append(name)
+
+            chosen = ""
+            cols = []
+            if FEATURE_TABLE_FALLBACK in candidate_tables:
+                cols = table_cols(FEATURE_TABLE_FALLBACK)
                 if "osm_id" in cols:
-                    chosen = tbl
-                    break
-        try:
-            con.close()
-        except Exception:
-            pass
+                    chosen = FEATURE_TABLE_FALLBACK
+            if not chosen:
+                for tbl in candidate_tables:
+                    cols = table_cols(tbl)
+                    if "osm_id" in cols:
+                        chosen = tbl
+                        break
         return chosen or "", cols if chosen else []
     except Exception:
         return "", []
@@ -452,15 +518,10 @@ def _detect_feature_table(gpkg_path):
 def _refresh_tables_and_columns(s, reset_selection=False):
     """Detect tables, choose table/id_col, and populate column options."""
     gpkg_path = getattr(s, "gpkg_path", "")
-    try:
-        from .utils.common import resolve_gpkg_path, log_gpkg_resolution
-        resolved, info = resolve_gpkg_path(gpkg_path)
-        log_gpkg_resolution(gpkg_path, resolved, info, prefix="[Spreadsheet][GPKG]")
-        if resolved and resolved != gpkg_path:
-            s.gpkg_path = resolved
-            gpkg_path = resolved
-    except Exception:
-        pass
+    resolved = _resolved_gpkg(gpkg_path, log_prefix="[Spreadsheet][GPKG]")
+    if resolved and resolved != gpkg_path:
+        s.gpkg_path = resolved
+        gpkg_path = resolved
     s.inspector_last_error = ""
     if not gpkg_path or not os.path.isfile(gpkg_path):
         s.attr_table = ""
@@ -479,22 +540,17 @@ def _refresh_tables_and_columns(s, reset_selection=False):
         prefer_table, prefer_id_col = None, None
 
     try:
-        if open_db_readonly:
-            con = open_db_readonly(gpkg_path, log_open=False)
-        else:
-            uri = f"file:{Path(gpkg_path).as_posix()}?mode=ro"
-            con = sqlite3.connect(uri, uri=True)
-        con.row_factory = sqlite3.Row
-        cur = con.cursor()
+        with _ro_conn(gpkg_path) as con:
+            cur = con.cursor()
 
-        tables = _list_user_tables(cur)
-        s.spreadsheet_tables_cache = json.dumps(tables)
+            tables = _list_user_tables(cur)
+            s.spreadsheet_tables_cache = json.dumps(tables)
 
-        columns_cache = {}
-        for t in tables:
-            t_sane = _sanitize_identifier(t)
-            rows = cur.execute(f'PRAGMA table_info("{t_sane}");').fetchall()
-            columns_cache[t] = [row[1] for row in rows]
+            columns_cache = {}
+            for t in tables:
+                t_sane = _sanitize_identifier(t)
+                rows = cur.execute(f'PRAGMA table_info("{t_sane}");').fetchall()
+                columns_cache[t] = [row[1] for row in rows]
 
         # Prefer osm_way_id (TEXT) over osm_id to avoid type mismatch in many GPKGs.
         preferred_ids = [prefer_id_col, getattr(s, "id_col", ""), "osm_way_id", "osm_id", "id", "fid"]
@@ -615,22 +671,14 @@ def refresh_osm_feature_tables(s, reset_selection=False):
         s.osm_feature_table = ""
         return []
     try:
-        if open_db_readonly:
-            con = open_db_readonly(gpkg_path, log_open=False)
-        else:
-            uri = f"file:{Path(gpkg_path).as_posix()}?mode=ro"
-            con = sqlite3.connect(uri, uri=True)
-        cur = con.cursor()
-        tables = _list_feature_tables(cur)
-        s.osm_feature_tables_cache = json.dumps(tables)
-
-        preferred = getattr(s, "osm_feature_table", "")
-        chosen = preferred if preferred in tables else (tables[0] if tables else "")
-        s.osm_feature_table = chosen
-        try:
-            con.close()
-        except Exception:
-            pass
+        with _ro_conn(gpkg_path) as con:
+            cur = con.cursor()
+            tables = _list_feature_tables(cur)
+            s.osm_feature_tables_cache = json.dumps(tables)
+
+            preferred = getattr(s, "osm_feature_table", "")
+            chosen = preferred if preferred in tables else (tables[0] if tables else "")
+            s.osm_feature_table = chosen
         refresh_osm_feature_columns(s, reset_selection=reset_selection)
         return tables
     except Exception as ex:
@@ -661,18 +709,10 @@ def refresh_osm_feature_columns(s, reset_selection=False):
         s.osm_feature_columns.clear()
         return []
     try:
-        if open_db_readonly:
-            con = open_db_readonly(gpkg_path, log_open=False)
-        else:
-            uri = f"file:{Path(gpkg_path).as_posix()}?mode=ro"
-            con = sqlite3.connect(uri, uri=True)
-        cur = con.cursor()
-        t_sane = _sanitize_identifier(table)
-        rows = cur.execute(f'PRAGMA table_info("{t_sane}");').fetchall()
-        try:
-            con.close()
-        except Exception:
-            pass
+        with _ro_conn(gpkg_path) as con:
+            cur = con.cursor()
+            t_sane = _sanitize_identifier(table)
+            rows = cur.execute(f'PRAGMA table_info("{t_sane}");').fetchall()
 
         cols = [row[1] for row in rows]
         prev_selected = {opt.name for opt in s.osm_feature_columns if opt.selected} if not reset_selection else set()
@@ -993,16 +1033,8 @@ def _parse_inspector_query(query_text):
             feature_key = code_attr.replace("osm_", "").replace("_code", "")
             cache_key = f"{feature_key}_code"
             try:
-                from .pipeline.diagnostics.legend_encoding import legend_encode
-                int_val = legend_encode(cache_key, val_str)
-                if int_val == 0:
-                    # Try case-insensitive
-                    from .pipeline.diagnostics.legend_encoding import _ENCODE_CACHE
-                    cache = _ENCODE_CACHE.get(cache_key, {})
-                    for k, v in cache.items():
-                        if k.lower() == val_str.lower():
-                            int_val = v
-                            break
+                from .pipeline.diagnostics.legend_encoding import legend_encode_casefold
+                int_val = legend_encode_casefold(cache_key, val_str)
             except Exception:
                 int_val = 0
 
@@ -1208,6 +1240,9 @@ def _resolve_inspector_db_path(s):
     return "", ""
 
 
+_SQL_LIMIT_RE = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+
+
 def _run_inspector_sql_query(s, query_sql: str):
     """Execute raw SQL against the Inspector DB and populate GENERIC row buffer.
 
@@ -1219,7 +1254,6 @@ def _run_inspector_sql_query(s, query_sql: str):
     Returns number of rows buffered.
     """
     import bpy
-    import json
     import time
 
     _inspector_clear_sql_buffer(s)
@@ -1244,8 +1278,8 @@ def _run_inspector_sql_query(s, query_sql: str):
     log_info(f"[Inspector][SQL] target={db_label} db={db_path}")
 
     # Safety: enforce LIMIT
-    sql = query_sql.rstrip().rstrip(";")
-    if "LIMIT" not in sql.upper():
+    sql = query_sql.rstrip(" \t\r\n;")
+    if not _SQL_LIMIT_RE.search(sql):
         sql = f"{sql} LIMIT 200"
 
     conn = None
@@ -1253,14 +1287,16 @@ def _run_inspector_sql_query(s, query_sql: str):
         from pathlib import Path as _P
         uri = f"file:{_P(db_path).as_posix()}?mode=ro"
         conn = sqlite3.connect(uri, uri=True)
-        conn.execute("PRAGMA query_only = ON;")
-        conn.execute("PRAGMA busy_timeout = 5000;")
+        conn.executescript(
+            "PRAGMA query_only=ON; PRAGMA busy_timeout=5000; "
+            "PRAGMA cache_size=-20000; PRAGMA mmap_size=268435456;"
+        )
 
-        t0 = time.time()
+        t0 = time.perf_counter_ns()
         cur = conn.execute(sql)
         cols = [d[0] for d in cur.description] if cur.description else []
         rows = cur.fetchmany(200)
-        elapsed = (time.time() - t0) * 1000.0
+        elapsed_us = (time.perf_counter_ns() - t0) // 1000
 
         # Store headers (up to 8 columns)
         hdr = s.inspector_sql_headers
@@ -1273,20 +1309,25 @@ def _run_inspector_sql_query(s, query_sql: str):
         s.inspector_sql_last_query = query_sql[:512]
 
         # Store rows (stringify all values into col0..col7)
+        col_names = tuple(f"col{i}" for i in range(min(len(cols), 8)))
         for r in rows:
             item = s.inspector_rows.add()
-            for i in range(min(len(r), 8)):
-                v = r[i]
-                setattr(item, f"col{i}", "" if v is None else str(v))
+            for cn, v in zip(col_names, r):
+                if v is None:
+                    setattr(item, cn, "")
+                elif v.__class__ is str:
+                    setattr(item, cn, v)
+                else:
+                    setattr(item, cn, str(v))
 
         s.inspector_row_count = len(s.inspector_rows)
         s.inspector_query_active = True
         s.inspector_sql_mode = True
 
-        summary = f"{len(rows)} rows, {len(cols)} cols from {db_label} ({elapsed:.0f}ms)"
+        summary = f"{len(rows)} rows, {len(cols)} cols from {db_label} ({elapsed_us // 1000}ms)"
         s.inspector_query_last_summary = summary
 
-        # Stats JSON for compatibility with summary box
+        # Stats for the summary box (kept as dict; serialized only if needed)
         stats = {
             "query_column": "SQL",
             "query_code": 0,
@@ -1294,10 +1335,10 @@ def _run_inspector_sql_query(s, query_sql: str):
             "unique_osm_ids": 0,
             "osm_id_list": [],
             "db_target": db_label,
-            "elapsed_ms": round(elapsed, 1),
+            "elapsed_ms": elapsed_us / 1000.0,
             "columns": cols[:8],
         }
-        s.inspector_query_last_stats_json = json.dumps(stats)
+        _set_inspector_stats(s, stats)
 
         log_info(f"[Inspector][SQL] Result: {summary}")
         _tag_redraw_all_view3d()
@@ -1607,15 +1648,8 @@ def _legend_encode_safe(code_attr, text_val):
     feature_key = code_attr.replace("osm_", "").replace("_code", "")
     cache_key = f"{feature_key}_code"
     try:
-        from .pipeline.diagnostics.legend_encoding import legend_encode, _ENCODE_CACHE
-        result = legend_encode(cache_key, text_val)
-        if result == 0:
-            # case-insensitive fallback
-            cache = _ENCODE_CACHE.get(cache_key, {})
-            for k, v in cache.items():
-                if k.lower() == text_val.lower():
-                    return v
-        return result
+        from .pipeline.diagnostics.legend_encoding import legend_encode_casefold
+        return legend_encode_casefold(cache_key, text_val)
     except Exception:
         return 0
 
@@ -1625,6 +1659,7 @@ def _clear_inspector_query_impl(s):
     s.inspector_query_active = False
     s.inspector_query_last_summary = ""
     s.inspector_query_last_stats_json = ""
+    _set_inspector_stats(s, None)
     _inspector_clear_sql_buffer(s)
     _inspector_clear_dsl_stats(s)
     # Reset legend decode output
@@ -1652,16 +1687,14 @@ def _zoom_to_inspector_selection_impl(context, s):
 
 def _export_inspector_report_impl(s):
     """Export inspector query results to CSV."""
-    import json
     output_dir = getattr(s, "output_dir", "").strip()
     if not output_dir:
         raise RuntimeError("output_dir not set")
 
-    stats_json = getattr(s, "inspector_query_last_stats_json", "")
-    if not stats_json:
+    stats = _get_inspector_stats(s)
+    if not stats:
         raise RuntimeError("No query results to export")
 
-    stats = json.loads(stats_json)
     report_path = os.path.join(output_dir, "inspector_query_report.csv")
 
     import csv
@@ -1912,21 +1945,18 @@ def _get_evaluated_mesh(context, obj):
 
 
 def _gather_building_indices(mesh):
+    """Return the sorted unique link keys (link_bidx/building_idx) present on mesh faces."""
     face_count = len(getattr(mesh, "polygons", []) or [])
-    attr = getattr(mesh, "attributes", None)
-    if not attr:
+    b_attr = _get_face_link_attr(mesh, face_count=face_count)
+    if b_attr is None or face_count == 0:
         return []
+    buf = np.empty(face_count, dtype=np.int32)
+    b_attr.data.foreach_get("value", buf)
+    return np.unique(buf).tolist()
 
-    def _pick_link_attr():
-        for name in ("link_bidx", "building_idx"):
-            a = attr.get(name)
-            if a and a.domain == "FACE" and a.data_type == "INT" and len(a.data) == face_count:
-                return a
-        return None
 
-    b_attr = _get_face_link_attr(mesh, face_count=face_count)
-    if b_attr is None:
-        return []
+_FACE_LINK_ATTR_NAMES = ("link_bidx", "building_idx")
+_FACE_LINK_ATTR_NAMES_BIDX_LAST = ("building_idx", "link_bidx")
 
 
 def _get_face_link_attr(mesh, face_count=None, prefer_link_bidx=True):
@@ -1938,20 +1968,13 @@ def _get_face_link_attr(mesh, face_count=None, prefer_link_bidx=True):
             face_count = len(mesh.polygons)
         except Exception:
             face_count = 0
-    for name in ("link_bidx", "building_idx") if prefer_link_bidx else ("building_idx", "link_bidx"):
-        a = mesh.attributes.get(name)
+    attrs = mesh.attributes
+    for name in _FACE_LINK_ATTR_NAMES if prefer_link_bidx else _FACE_LINK_ATTR_NAMES_BIDX_LAST:
+        a = attrs.get(name)
         if a and a.domain == "FACE" and a.data_type == "INT" and len(a.data) == face_count:
             return a
     return None
 
-    vals = set()
-    try:
-        for item in b_attr.data:
-            vals.add(int(item.value))
-    except Exception:
-        return list(vals)
-    return sorted(vals)
-
 
 def _is_link_db_valid(link_db_path):
     """Check if link DB file exists and is accessible. Robust against path normalization issues."""
@@ -1991,6 +2014,35 @@ def _get_osm_key_col(s):
     return None
 
 
+# Link-map cache: {link_db_path: ((size, mtime_ns, schema_version), mapping)}
+_LINK_MAP_CACHE = {}
+
+
+def _gpkg_change_sig(path: str):
+    """(size, mtime_ns, wal) for a user GPKG, wal being the -wal sidecar's (size, mtime_ns)
+    or None; None if the file cannot be stat'ed.
+
+    WAL-mode writers (e.g. QGIS) commit into the -wal file and leave the main file's
+    size/mtime untouched, so both are needed to notice an edit.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    try:
+        wst = os.stat(f"{path}-wal")
+        wal = (wst.st_size, wst.st_mtime_ns)
+    except OSError:
+        wal = None
+    return (st.st_size, st.st_mtime_ns, wal)
+
+
+def _sqlite_file_sig(path: str, cur):
+    """(size, mtime_ns, PRAGMA schema_version) — changes whenever the DB file is rewritten."""
+    st = os.stat(path)
+    return (st.st_size, st.st_mtime_ns, cur.execute("PRAGMA schema_version").fetchone()[0])
+
+
 def _load_link_lookup(s):
     mapping = {}
     # Prefer link DB
@@ -2022,6 +2074,12 @@ def _load_link_lookup(s):
                     con = sqlite3.connect(uri, uri=True)
                 con.row_factory = sqlite3.Row
                 cur = con.cursor()
+                sig = _sqlite_file_sig(str(p), cur)
+                cached = _LINK_MAP_CACHE.get(str(p))
+                if cached is not None and cached[0] == sig:
+                    con.close()
+                    log_info(f"[LINKMAP] entries={len(cached[1])} (cached)")
+                    return cached[1]
                 # Be tolerant to schema differences (some runs include dist_m/iou).
                 cols = {r[1] for r in cur.execute("PRAGMA table_info('gml_osm_links');").fetchall()}
                 
@@ -2042,23 +2100,24 @@ def _load_link_lookup(s):
                 
                 log_info(f"[OSM_KEY] linkdb id column used: {id_col_used}")
                 
+                # Fixed positional layout; metrics missing from this schema are selected as 0.0
                 select_cols = ["source_tile", "building_idx", id_select]
-                if "dist_m" in cols:
-                    select_cols.append("dist_m")
-                if "confidence" in cols:
-                    select_cols.append("confidence")
-                if "iou" in cols:
-                    select_cols.append("iou")
-                rows = cur.execute(f"SELECT {', '.join(select_cols)} FROM gml_osm_links;").fetchall()
-                for r in rows:
+                for metric in ("confidence", "dist_m", "iou"):
+                    select_cols.append(metric if metric in cols else "0.0")
+                rows_cur = con.cursor()
+                rows_cur.row_factory = None  # plain tuples, unpacked below
+                _f = float
+                _norm = norm_source_tile
+                for tile, bidx, osm_id, conf, dist, iou in rows_cur.execute(
+                    f"SELECT {', '.join(select_cols)} FROM gml_osm_links;"
+                ):
                     try:
-                        key = (norm_source_tile(r["source_tile"]), int(r["building_idx"]))
-                        osm_raw = _norm_id(r["osm_id"])  # Normalised via _norm_id (always string)
-                        mapping[key] = {
+                        osm_raw = _norm_id(osm_id)  # Normalised via _norm_id (always string)
+                        mapping[(_norm(tile), int(bidx))] = {
                             "osm_id": osm_raw if osm_raw else "—",
-                            "link_conf": float(r["confidence"] or 0.0) if ("confidence" in r.keys()) else 0.0,
-                            "link_dist_m": float(r["dist_m"] or 0.0) if ("dist_m" in r.keys()) else 0.0,
-                            "link_iou": float(r["iou"] or 0.0) if ("iou" in r.keys()) else 0.0,
+                            "link_conf": _f(conf or 0.0),
+                            "link_dist_m": _f(dist or 0.0),
+                            "link_iou": _f(iou or 0.0),
                         }
                     except Exception:
                         continue
@@ -2070,6 +2129,7 @@ def _load_link_lookup(s):
                     row_val = mapping[sk]
                     log_info(f"  {sk!r} -> osm_id={row_val.get('osm_id', '?')}")
                 con.close()
+                _LINK_MAP_CACHE[str(p)] = (sig, mapping)
                 return mapping
             except Exception:
                 mapping = {}
@@ -2080,26 +2140,26 @@ def _load_link_lookup(s):
         csv_files = sorted(out_dir.glob("M1DC_LinkMapping_*.csv"), reverse=True)
         for csv_path in csv_files:
             try:
-                with csv_path.open("r", encoding="utf-8") as f:
-                    headers = None
-                    for line in f:
-                        line = line.strip()
-                        if not line:
-                            continue
-                        if headers is None:
-                            headers = [h.strip() for h in line.split(",")]
+                with csv_path.open("r", encoding="utf-8", newline="", buffering=1 << 20) as f:
+                    reader = csv.DictReader(f)
+                    fields = [h.strip() for h in (reader.fieldnames or [])]
+                    reader.fieldnames = fields
+                    dist_key = "dist_m" if "dist_m" in fields else "link_dist_m"
+                    iou_key = "iou" if "iou" in fields else "link_iou"
+                    _f = float
+                    _norm = norm_source_tile
+                    for row in reader:
+                        try:
+                            key = (_norm((row.get("source_tile") or "").strip()),
+                                   int(_f(row.get("building_idx") or 0)))
+                            mapping[key] = {
+                                "osm_id": (row.get("osm_id") or "").strip() or "—",
+                                "link_conf": _f(row.get("confidence") or 0.0),
+                                "link_dist_m": _f(row.get(dist_key) or 0.0),
+                                "link_iou": _f(row.get(iou_key) or 0.0),
+                            }
+                        except (TypeError, ValueError):
                             continue
-                        parts = [p.strip() for p in line.split(",")]
-                        row = {h: parts[i] if i < len(parts) else "" for i, h in enumerate(headers)}
-                        key = (norm_source_tile(row.get("source_tile", "")), int(float(row.get("building_idx", 0) or 0)))
-                        dist_m = float(row.get("dist_m", row.get("link_dist_m", 0)) or 0.0)
-                        iou = float(row.get("iou", row.get("link_iou", 0)) or 0.0)
-                        mapping[key] = {
-                            "osm_id": row.get("osm_id", "") or "—",
-                            "link_conf": float(row.get("confidence", 0) or 0.0),
-                            "link_dist_m": dist_m,
-                            "link_iou": iou,
-                        }
                 if mapping:
                     return mapping
             except Exception:
@@ -2107,12 +2167,19 @@ def _load_link_lookup(s):
     return mapping
 
 
+_CANONICAL_ID_MATCH = re.compile(r"[1-9][0-9]*").fullmatch
+
+
 def _norm_id(v) -> str:
     """Central ID normalisation for ALL lookup keys.
     Every key used in any dict/DB lookup MUST pass through this.
     Returns canonical TEXT key: "" for invalid/empty, digit-string otherwise.
     Handles int, float, str, bytes, bool, None.
+    Non-empty keys are interned so repeated dict/set lookups compare by identity.
     """
+    # Fast path: already-canonical digit string (the dominant case)
+    if type(v) is str and _CANONICAL_ID_MATCH(v):
+        return sys.intern(v)
     if v is None or v is False:
         return ""
     if isinstance(v, bool):
@@ -2120,18 +2187,18 @@ def _norm_id(v) -> str:
     if isinstance(v, bytes):
         v = v.decode("utf-8", "ignore")
     if isinstance(v, int):
-        return str(v) if v != 0 else ""
+        return sys.intern(str(v)) if v != 0 else ""
     if isinstance(v, float):
         iv = int(v)
-        return str(iv) if iv != 0 else ""
+        return sys.intern(str(iv)) if iv != 0 else ""
     if isinstance(v, str):
         s = v.strip()
         if s.endswith(".0"):
             s = s[:-2]
-        return s if s.isdigit() and s != "0" else ""
+        return sys.intern(s) if s.isdigit() and s != "0" else ""
     try:
         s = str(v).strip()
-        return s if s.isdigit() and s != "0" else ""
+        return sys.intern(s) if s.isdigit() and s != "0" else ""
     except Exception:
         return ""
 
@@ -2143,6 +2210,169 @@ def _sqlite_list_tables(cur):
     ).fetchall()]
 
 
+def _sqlite_table_columns(cur):
+    """Return {table: set(column names)} for all tables in one pragma_table_info join."""
+    table_cols = defaultdict(set)
+    for tbl, col in cur.execute(
+        "SELECT m.name, p.name FROM sqlite_master m JOIN pragma_table_info(m.name) p "
+        "WHERE m.type='table' ORDER BY m.name, p.cid"
+    ):
+        table_cols[tbl].add(col)
+    return dict(table_cols)
+
+
+def _open_ro(path: str, immutable: bool = False):
+    """Open a SQLite/GPKG file read-only for Phase 4 / MKDB loaders.
+
+    immutable=True adds immutable=1, which skips locking and change detection; pass
+    it only for the pipeline's own linkdb/mkdb, which are not written while they are
+    read here. A user GeoPackage stays plain mode=ro: editors such as QGIS write it
+    in WAL mode, which leaves the main file's size/mtime untouched and is invisible
+    to an immutable reader. query_only is deliberately not set: mode=ro already
+    protects the file, and _bulk_select_by_ids needs a TEMP table.
+    """
+    flags = "mode=ro&immutable=1" if immutable else "mode=ro"
+    con = sqlite3.connect(
+        f"file:{Path(path).as_posix()}?{flags}", uri=True, check_same_thread=False
+    )
+    con.executescript(
+        "PRAGMA mmap_size=268435456; PRAGMA cache_size=-65536; PRAGMA temp_store=MEMORY;"
+    )
+    return con
+
+
+# Read-only connection pool: {(path, immutable): ((size, mtime_ns), LifoQueue[Connection])}
+# Keyed on the file signature because immutable=1 handles must never outlive a rewrite.
+_RO_POOL_SIZE = 4
+_RO_POOL = {}
+_RO_POOL_LOCK = threading.Lock()
+
+
+def _ro_pool_entry(key):
+    st = os.stat(key[0])
+    sig = (st.st_size, st.st_mtime_ns)
+    with _RO_POOL_LOCK:
+        entry = _RO_POOL.get(key)
+        if entry is None or entry[0] != sig:
+            if entry is not None:
+                _drain_ro_pool(entry[1])
+            entry = (sig, queue.LifoQueue(maxsize=_RO_POOL_SIZE))
+            _RO_POOL[key] = entry
+    return entry
+
+
+def _drain_ro_pool(pool):
+    while True:
+        try:
+            pool.get_nowait().close()
+        except queue.Empty:
+            return
+        except Exception:
+            continue
+
+
+@atexit.register
+def _close_ro_pools():
+    """Close every pooled read-only handle at interpreter exit (Blender quit)."""
+    with _RO_POOL_LOCK:
+        entries = list(_RO_POOL.values())
+        _RO_POOL.clear()
+    for _sig, pool in entries:
+        _drain_ro_pool(pool)
+
+
+@contextmanager
+def _ro_conn(path: str, immutable: bool = False):
+    """Check out a pooled _open_ro() connection (row_factory=sqlite3.Row) for `path`."""
+    key = (str(path), bool(immutable))
+    entry = _ro_pool_entry(key)
+    try:
+        con = entry[1].get_nowait()
+    except queue.Empty:
+        con = _open_ro(key[0], immutable=key[1])
+    con.row_factory = sqlite3.Row
+    try:
+        yield con
+    finally:
+        if _RO_POOL.get(key) is entry:
+            try:
+                entry[1].put_nowait(con)
+                con = None
+            except queue.Full:
+                pass
+        if con is not None:
+            con.close()
+
+
+def _ensure_id_index(db_path: str, table: str, id_col: str, logger=print) -> bool:
+    """Make sure `table` has an index led by `id_col` so id joins are B-tree lookups.
+
+    Checked on a pooled read-only handle; only when the index is missing is the
+    file opened read/write to CREATE INDEX + ANALYZE (once per file, since the
+    index persists). Returns True if an index exists afterwards.
+    """
+    try:
+        with _ro_conn(db_path, immutable=True) as con:
+            row = con.execute(
+                "SELECT 1 FROM pragma_index_list(?) il JOIN pragma_index_info(il.name) ii "
+                "WHERE ii.seqno = 0 AND ii.name = ? LIMIT 1",
+                (table, id_col),
+            ).fetchone()
+        if row is not None:
+            return True
+        con_rw = sqlite3.connect(db_path)
+        try:
+            con_rw.execute(f'CREATE INDEX IF NOT EXISTS "idx_{table}__{id_col}" ON "{table}"("{id_col}")')
+            con_rw.execute(f'ANALYZE "{table}"')
+            con_rw.commit()
+        finally:
+            con_rw.close()
+        logger(f"[LINKDB] created index idx_{table}__{id_col} in {db_path}")
+        return True
+    except Exception as ex:
+        logger(f"[LINKDB][WARN] could not ensure index on {table}({id_col}): {ex}")
+        return False
+
+
+def _bulk_select_by_ids(cur, table: str, id_col: str, ids, select_cols="*", cast_id_text=False):
+    """Yield rows of `table` whose `id_col` is in `ids`, via one TEMP-table join.
+
+    The ids are bound once with executemany into temp._ids and SQLite plans a
+    single join, instead of one chunked ``IN (?, ...)`` query per 900 ids.
+    `select_cols` is "*" or a sequence of column names of `table`.
+    cast_id_text=True matches on CAST(id_col AS TEXT), for string-normalized ids.
+    On a pooled _ro_conn handle, wrap the generator in contextlib.closing inside the
+    ``with`` block so temp._ids is dropped before the connection is returned.
+    """
+    if select_cols == "*":
+        cols_sql = "t.*"
+    else:
+        cols_sql = ", ".join(f't."{c}"' for c in select_cols)
+    id_expr = f'CAST(t."{id_col}" AS TEXT)' if cast_id_text else f't."{id_col}"'
+    cur.execute("DROP TABLE IF EXISTS temp._ids")
+    cur.execute("CREATE TEMP TABLE _ids(id TEXT PRIMARY KEY) WITHOUT ROWID")
+    try:
+        cur.executemany("INSERT OR IGNORE INTO temp._ids VALUES (?)", ((i,) for i in ids))
+        # Plain loop, not ``yield from``: closing the generator would forward close()
+        # to the cursor and the cleanup below could no longer run on it
+        for row in cur.execute(
+            f'SELECT {cols_sql} FROM "{table}" t JOIN temp._ids ON {id_expr} = temp._ids.id'
+        ):
+            yield row
+    finally:
+        cur.execute("DROP TABLE IF EXISTS temp._ids")
+        cur.connection.commit()
+
+
+# Directory-scan cache for _resolve_feature_db_path: {dir: (dir_mtime_ns, [(path, source_tag)])}
+# Only the matching names are cached; sizes are re-stat'ed per call, since a DB
+# overwritten in place does not bump the directory mtime.
+_FEATURE_DB_SCAN_CACHE = {}
+
+# Feature-DB file suffixes in priority order (*_links.sqlite before *_linkdb.sqlite)
+_FEATURE_DB_SUFFIXES = ("_links.sqlite", "_linkdb.sqlite")
+
+
 def _resolve_feature_db_path() -> str:
     """Deterministic Feature-DB selection for Phase 4 / MKDB.
     Priority:
@@ -2158,32 +2388,67 @@ def _resolve_feature_db_path() -> str:
     # Priority 1: scene setting
     try:
         s = bpy.context.scene.m1dc_settings
+        seen = set()
         for attr_name in ("links_db_path", "link_db_path"):
             p = getattr(s, attr_name, "").strip() if hasattr(s, attr_name) else ""
-            if p and os.path.isfile(p):
+            if not p or p in seen:
+                continue
+            seen.add(p)
+            try:
                 st = os.stat(p)
-                candidates.append((p, st.st_size, st.st_mtime, "scene_setting"))
-                print(f"[PROOF][FEATURE_DB] candidate={p} exists=True size={st.st_size} mtime={st.st_mtime} source={attr_name}")
+            except OSError:
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            candidates.append((p, st.st_size, st.st_mtime, "scene_setting"))
+            print(f"[PROOF][FEATURE_DB] candidate={p} exists=True size={st.st_size} mtime={st.st_mtime} source={attr_name}")
     except Exception:
         pass
 
     # Priority 2: output_dir scan (canonical location: output_dir/links/ per artifact contract)
+    # Skipped when the scene setting already supplied a candidate (it always wins).
     try:
-        out = get_output_dir()
+        out = get_output_dir() if not candidates else None
         if out and out.exists():
             # Scan CANONICAL location first: output_dir/links/
             links_subdir = out / "links"
             scan_dirs = [links_subdir, out]  # canonical first, then root (legacy)
             for scan_dir in scan_dirs:
-                if not scan_dir.is_dir():
+                dir_key = str(scan_dir)
+                try:
+                    dir_mtime = os.stat(dir_key).st_mtime_ns
+                except OSError:
                     continue
-                for pattern in ("*_links.sqlite", "*_linkdb.sqlite"):
-                    for fp in sorted(scan_dir.glob(pattern)):
-                        if fp.is_file():
-                            st = fp.stat()
-                            source_tag = f"links_subdir:{pattern}" if scan_dir == links_subdir else f"glob:{pattern}"
-                            candidates.append((str(fp), st.st_size, st.st_mtime, source_tag))
-                            print(f"[PROOF][FEATURE_DB] candidate={fp} exists=True size={st.st_size} mtime={st.st_mtime} source={source_tag}")
+                cached = _FEATURE_DB_SCAN_CACHE.get(dir_key)
+                if cached is not None and cached[0] == dir_mtime:
+                    found = cached[1]
+                else:
+                    # One scandir pass; suffixes compared case-insensitively like the
+                    # Windows glob this replaced
+                    hits = []
+                    with os.scandir(dir_key) as it:
+                        for de in it:
+                            n = de.name
+                            n_low = n.lower()
+                            for rank, suffix in enumerate(_FEATURE_DB_SUFFIXES):
+                                if n_low.endswith(suffix):
+                                    if de.is_file():
+                                        hits.append((rank, n, de.path))
+                                    break
+                    hits.sort(key=lambda h: (h[0], h[1]))
+                    found = []
+                    for rank, n, path in hits:
+                        pattern = f"*{_FEATURE_DB_SUFFIXES[rank]}"
+                        source_tag = f"links_subdir:{pattern}" if scan_dir == links_subdir else f"glob:{pattern}"
+                        found.append((path, source_tag))
+                    _FEATURE_DB_SCAN_CACHE[dir_key] = (dir_mtime, found)
+                for path, source_tag in found:
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    candidates.append((path, st.st_size, st.st_mtime, source_tag))
+                    print(f"[PROOF][FEATURE_DB] candidate={path} exists=True size={st.st_size} mtime={st.st_mtime} source={source_tag}")
     except Exception:
         pass
 
@@ -2203,33 +2468,88 @@ def _resolve_feature_db_path() -> str:
     return chosen[0]
 
 
-# Mismatch log guard for _safe_read_face_id_attr (1x per mesh name)
-_SAFE_READ_MISMATCH_LOGGED = set()
+_ID_ATTR_NAMES = ("osm_way_id", "osm_id_int", "osm_id")
 
 
-def _safe_read_face_id_attr(mesh, face_idx) -> str:
-    """Read canonical OSM ID from a face, bytes-safe, with length guard.
+@functools.lru_cache(maxsize=1024)
+def _log_id_attr_mismatch(mesh_name, attr_name, attr_len, face_count):
+    """Log an id attribute length mismatch once per (mesh, attr, lengths)."""
+    print(f"[SAFE_READ] SKIP attr={attr_name} mesh={mesh_name} attr_len={attr_len} face_count={face_count}")
+
+
+def _resolve_id_attr(mesh):
+    """Resolve usable FACE id attributes once, in priority order.
     Priority: osm_way_id > osm_id_int > osm_id.
-    Returns canonical TEXT key ("" or digit-string) via _norm_id.
+    Returns [(attr, name), ...]; attributes whose length differs from the face count are skipped.
+    Handles are resolved fresh on every call (RNA pointers go stale after attribute edits).
     """
-    mesh_name = getattr(mesh, "name", "?")
     face_count = len(mesh.polygons) if mesh else 0
     if face_count == 0:
-        return ""
-
-    for attr_name in ("osm_way_id", "osm_id_int", "osm_id"):
+        return []
+    resolved = []
+    for attr_name in _ID_ATTR_NAMES:
         a = mesh.attributes.get(attr_name)
         if a is None or a.domain != "FACE":
             continue
         if len(a.data) != face_count:
-            if mesh_name not in _SAFE_READ_MISMATCH_LOGGED:
-                _SAFE_READ_MISMATCH_LOGGED.add(mesh_name)
-                print(f"[SAFE_READ] SKIP attr={attr_name} mesh={mesh_name} attr_len={len(a.data)} face_count={face_count}")
+            _log_id_attr_mismatch(getattr(mesh, "name_full", "?"), attr_name, len(a.data), face_count)
             continue
+        resolved.append((a, attr_name))
+    return resolved
+
+
+def _read_id_column(attr, face_count):
+    """Read one id attribute into an object array of canonical keys ("" = no id)."""
+    if attr.data_type == "INT":
+        buf = np.empty(face_count, dtype=np.int32)
+        attr.data.foreach_get("value", buf)
+        uniq, inv = np.unique(buf, return_inverse=True)
+        # Vectorized equivalent of _norm_id for ints: 0 -> "", else the decimal string
+        keys = np.full(uniq.size, "", dtype=object)
+        nz = uniq != 0
+        if nz.any():
+            keys[nz] = [sys.intern(s) for s in uniq[nz].astype(str).tolist()]
+        return keys[inv]
+    memo = {}
+    out = np.empty(face_count, dtype=object)
+    for i, d in enumerate(attr.data):
+        raw = d.value
+        k = memo.get(raw)
+        if k is None:
+            k = memo[raw] = _norm_id(raw)
+        out[i] = k
+    return out
+
+
+def _batch_read_face_ids(mesh):
+    """Read canonical OSM IDs for all faces at once.
+    Same semantics as _safe_read_face_id_attr: per face, the first attribute in
+    priority order with a non-empty key wins. Returns an object ndarray of str.
+    """
+    face_count = len(mesh.polygons) if mesh else 0
+    out = np.full(face_count, "", dtype=object)
+    pending = None
+    for attr, _name in _resolve_id_attr(mesh):
+        col = _read_id_column(attr, face_count)
+        if pending is None:
+            out = col
+        else:
+            out[pending] = col[pending]
+        pending = out == ""
+        if not pending.any():
+            break
+    return out
+
+
+def _safe_read_face_id_attr(mesh, face_idx) -> str:
+    """Read canonical OSM ID from a single face, bytes-safe, with length guard.
+    Thin shim over _resolve_id_attr; loops over many faces should use _batch_read_face_ids.
+    Returns canonical TEXT key ("" or digit-string) via _norm_id.
+    """
+    for a, _name in _resolve_id_attr(mesh):
         if face_idx < 0 or face_idx >= len(a.data):
             return ""
-        raw = a.data[face_idx].value
-        k = _norm_id(raw)
+        k = _norm_id(a.data[face_idx].value)
         if k:
             return k
     return ""
@@ -2254,6 +2574,54 @@ def _dump_face_attr_schema(mesh, names=("osm_way_id", "osm_id_int", "osm_id", "h
     print(f"[MKDB][SCHEMA] mesh={mesh.name} {out}")
 
 
+def _extract_mesh_bidx(mesh_obj):
+    """Bulk-read the per-face building index of one mesh (RNA access: main thread only).
+
+    Index attr priority: gml_building_idx > gml__building_idx > link_bidx/building_idx
+    (identical fallback chain as Materialize).
+    Returns (source_tile, unique_bidx ndarray, attr_name, face_count) or None.
+    """
+    mesh = mesh_obj.data
+    if not mesh or not hasattr(mesh, "attributes"):
+        return None
+
+    face_count = len(mesh.polygons)
+    if face_count == 0:
+        return None
+
+    idx_attr = None
+    idx_name = None
+    for candidate in ("gml_building_idx", "gml__building_idx"):
+        a = mesh.attributes.get(candidate)
+        if a and a.domain == "FACE" and a.data_type == "INT" and len(a.data) == face_count:
+            idx_attr = a
+            idx_name = candidate
+            break
+    if idx_attr is None:
+        idx_attr = _get_face_link_attr(mesh, face_count=face_count)
+        if idx_attr:
+            idx_name = getattr(idx_attr, "name", "fallback")
+
+    if idx_attr is None or idx_attr.domain != "FACE":
+        return None
+
+    buf = np.empty(face_count, dtype=np.int32)
+    idx_attr.data.foreach_get("value", buf)
+    return _get_source_tile(mesh_obj), np.unique(buf), idx_name, face_count
+
+
+def _resolve_keys(source_tile, bidx_array, link_map):
+    """Map unique building indices of one tile to normalized osm_way_id keys via link_map."""
+    keys = set()
+    for bidx in bidx_array.tolist():
+        row = link_map.get((source_tile, bidx))
+        if row:
+            osm_way_id = _normalize_osm_id(row.get("osm_id"))
+            if osm_way_id and osm_way_id not in ("\u2014", "0"):
+                keys.add(sys.intern(osm_way_id))
+    return keys
+
+
 def _collect_unique_osm_keys_from_meshes(mesh_objs, link_map):
     """Collect unique non-empty osm_way_ids from meshes via link_map lookup.
     EXACTLY the same logic as Materialize uses for unique_osm_way_ids:
@@ -2269,48 +2637,22 @@ def _collect_unique_osm_keys_from_meshes(mesh_objs, link_map):
     faces_scanned_total = 0
     id_attr_names_seen = Counter()
 
+    # Pass 1 (RNA): bulk-read indices; group per tile so each (tile, bidx) is resolved once
+    bidx_by_tile = {}
     for mesh_obj in mesh_objs:
-        mesh = mesh_obj.data
-        if not mesh or not hasattr(mesh, "attributes"):
-            continue
-
-        source_tile = _get_source_tile(mesh_obj)
-        face_count = len(mesh.polygons)
-        if face_count == 0:
-            continue
-
-        # ---- bidx attr: gml_building_idx > gml__building_idx > link_bidx/building_idx
-        #      (identical fallback chain as Materialize)
-        idx_attr = None
-        idx_name = None
-        for candidate in ("gml_building_idx", "gml__building_idx"):
-            a = mesh.attributes.get(candidate)
-            if a and a.domain == "FACE" and a.data_type == "INT" and len(a.data) == face_count:
-                idx_attr = a
-                idx_name = candidate
-                break
-        if idx_attr is None:
-            idx_attr = _get_face_link_attr(mesh, face_count=face_count)
-            if idx_attr:
-                idx_name = getattr(idx_attr, "name", "fallback")
-
-        if idx_attr is None or idx_attr.domain != "FACE":
+        extracted = _extract_mesh_bidx(mesh_obj)
+        if extracted is None:
             continue
-
+        source_tile, unique_bidx, idx_name, face_count = extracted
         id_attr_names_seen[idx_name] += 1
         mesh_count_scanned += 1
+        faces_scanned_total += face_count
+        bidx_by_tile.setdefault(source_tile, []).append(unique_bidx)
 
-        for poly_idx in range(face_count):
-            faces_scanned_total += 1
-            try:
-                bidx = int(idx_attr.data[poly_idx].value)
-            except Exception:
-                continue
-            row = link_map.get((source_tile, bidx))
-            if row:
-                osm_way_id = _normalize_osm_id(row.get("osm_id"))
-                if osm_way_id and osm_way_id not in ("\u2014", "0"):
-                    keys.add(osm_way_id)
+    # Pass 2 (pure Python): link_map lookups over the merged unique indices
+    for source_tile, arrays in bidx_by_tile.items():
+        merged = arrays[0] if len(arrays) == 1 else np.unique(np.concatenate(arrays))
+        keys.update(_resolve_keys(source_tile, merged, link_map))
 
     proof = {
         "mesh_count_scanned": mesh_count_scanned,
@@ -2321,34 +2663,90 @@ def _collect_unique_osm_keys_from_meshes(mesh_objs, link_map):
     return keys, proof
 
 
+@functools.lru_cache(maxsize=32)
+def _file_sig_cached(path: str, size: int, mtime_ns: int):
+    # Keyed on stat fields, so a changed file is a cache miss; resolve() only runs on misses.
+    return f"{Path(path).resolve()}|{size}|{mtime_ns // 1_000_000_000}"
+
+
 def _file_sig(path: str):
     """Compute file signature for build hash."""
-    import hashlib
-    p = Path(path)
     try:
-        st = p.stat()
-        return f"{p.resolve()}|{st.st_size}|{int(st.st_mtime)}"
+        st = os.stat(path)
     except FileNotFoundError:
-        return f"{p}|MISSING"
+        return f"{Path(path)}|MISSING"
+    return _file_sig_cached(os.fspath(path), st.st_size, st.st_mtime_ns)
 
 
-def _build_hash(linkdb_path: str, gpkg_path: str | None, schema_version: str):
-    """Compute deterministic build hash from source files."""
+@functools.lru_cache(maxsize=32)
+def _build_hash_from_sigs(linkdb_sig: str, gpkg_sig: str | None, schema_version: str):
     import hashlib
     h = hashlib.sha256()
-    h.update(_file_sig(linkdb_path).encode("utf-8"))
-    if gpkg_path:
-        h.update(_file_sig(gpkg_path).encode("utf-8"))
+    h.update(linkdb_sig.encode("utf-8"))
+    if gpkg_sig:
+        h.update(gpkg_sig.encode("utf-8"))
     h.update(f"schema:{schema_version}".encode("utf-8"))
     return h.hexdigest()
 
 
+def _build_hash(linkdb_path: str, gpkg_path: str | None, schema_version: str):
+    """Compute deterministic build hash from source files."""
+    return _build_hash_from_sigs(
+        _file_sig(linkdb_path),
+        _file_sig(gpkg_path) if gpkg_path else None,
+        schema_version,
+    )
+
+
 def _copy_latest(src_path: str, latest_path: str, logger=print):
-    """Copy mkdb to latest_mkdb.sqlite pointer."""
+    """Point latest_mkdb.sqlite at the mkdb.
+    Hash-named mkdbs are never rewritten after build, so a hardlink is safe;
+    falls back to copy_file_range (reflink/in-kernel copy) and then shutil.copy2.
+    The new file is staged next to latest and swapped in with os.replace.
+    """
     try:
-        import shutil
-        shutil.copy2(src_path, latest_path)
-        logger(f"[MKDB] updated latest -> {latest_path}")
+        st = os.stat(src_path)
+        try:
+            if os.path.samestat(st, os.stat(latest_path)):
+                return
+        except OSError:
+            pass
+
+        tmp_path = f"{latest_path}.tmp"
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+        method = None
+        try:
+            os.link(src_path, tmp_path)
+            method = "hardlink"
+        except (OSError, AttributeError):
+            pass
+
+        if method is None and hasattr(os, "copy_file_range"):
+            try:
+                with open(src_path, "rb") as fs, open(tmp_path, "wb") as fd:
+                    remaining = st.st_size
+                    while remaining > 0:
+                        n = os.copy_file_range(fs.fileno(), fd.fileno(), remaining)
+                        if n <= 0:
+                            break
+                        remaining -= n
+                if remaining == 0:
+                    os.utime(tmp_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+                    method = "copy_file_range"
+            except OSError:
+                pass
+
+        if method is None:
+            import shutil
+            shutil.copy2(src_path, tmp_path)
+            method = "copy2"
+
+        os.replace(tmp_path, latest_path)
+        logger(f"[MKDB] updated latest -> {latest_path} ({method})")
     except Exception as e:
         logger(f"[MKDB][WARN] could not write latest: {e}")
 
@@ -2364,12 +2762,32 @@ def _copy_latest(src_path: str, latest_path: str, logger=print):
 # mkdb schema version
 MKDB_SCHEMA_VERSION = "mkdb_v1"
 
+# Rows per executemany batch when streaming linkdb -> mkdb
+_MKDB_INSERT_BATCH = 2048
+
+# Page cache / temp store / mmap for the mkdb build (applied to source and destination)
+_MKDB_BULK_PRAGMAS = (
+    "PRAGMA cache_size=-262144; PRAGMA temp_store=MEMORY; PRAGMA mmap_size=536870912;"
+)
+
 # Feature columns to extract from linkdb
-FEATURE_COLS = [
+FEATURE_COLS = [sys.intern(c) for c in (
     "building", "amenity", "landuse", "type", "name",
     "shop", "office", "leisure", "historic", "tourism", "man_made", "natural", "military",
     "craft", "aeroway", "barrier", "boundary", "admin_level"
-]
+)]
+FEATURE_COLS_TUPLE = tuple(FEATURE_COLS)
+
+# Constant mkdb SQL, built once at module load
+_MKDB_COLS = ("osm_way_id",) + FEATURE_COLS_TUPLE
+_CREATE_FEATURES_SQL = (
+    "CREATE TABLE IF NOT EXISTS features (osm_way_id TEXT PRIMARY KEY, "
+    + ", ".join(f"{c} TEXT" for c in FEATURE_COLS_TUPLE) + ");"
+)
+_INSERT_FEATURES_SQL = (
+    f"INSERT OR REPLACE INTO features({', '.join(_MKDB_COLS)}) "
+    f"VALUES ({', '.join('?' * len(_MKDB_COLS))})"
+)
 
 
 def build_mkdb_from_linkdb(
@@ -2413,9 +2831,12 @@ def build_mkdb_from_linkdb(
     logger(f"[MKDB] Building mkdb: {mkdb_path}")
     t0 = time.time()
 
+    _ensure_id_index(linkdb_path, "osm_building_link", "osm_way_id", logger=logger)
+
     # Open linkdb source
     con_src = sqlite3.connect(linkdb_path)
     con_src.row_factory = sqlite3.Row
+    con_src.executescript(_MKDB_BULK_PRAGMAS)
     cur_src = con_src.cursor()
 
     # Sanity: check required table
@@ -2428,7 +2849,11 @@ def build_mkdb_from_linkdb(
     con = sqlite3.connect(mkdb_path)
     cur = con.cursor()
 
-    # Optimize SQLite for bulk writes
+    # Optimize SQLite for bulk writes (page_size must precede WAL and table creation;
+    # nothing else reads the mkdb while it is being built)
+    cur.execute("PRAGMA page_size=8192;")
+    cur.executescript(_MKDB_BULK_PRAGMAS)
+    cur.execute("PRAGMA locking_mode=EXCLUSIVE;")
     cur.execute("PRAGMA journal_mode=WAL;")
     cur.execute("PRAGMA synchronous=NORMAL;")
 
@@ -2441,13 +2866,7 @@ def build_mkdb_from_linkdb(
     """)
 
     # Create features table
-    col_defs = ",\n".join([f"{c} TEXT" for c in FEATURE_COLS])
-    cur.execute(f"""
-    CREATE TABLE IF NOT EXISTS features (
-        osm_way_id TEXT PRIMARY KEY,
-        {col_defs}
-    );
-    """)
+    cur.execute(_CREATE_FEATURES_SQL)
 
     # Write metadata
     now = time.strftime("%Y-%m-%dT%H:%M:%S")
@@ -2466,38 +2885,23 @@ def build_mkdb_from_linkdb(
         list(meta.items())
     )
 
-    # Extract features from linkdb in chunks (SQLite IN limit ~1000)
-    def chunks(lst, n=900):
-        for i in range(0, len(lst), n):
-            yield lst[i:i+n]
-
+    # Extract features from linkdb (single TEMP-table join over ids_str)
     total_insert = 0
-    select_cols = ", ".join(["osm_way_id"] + FEATURE_COLS)
-
-    for part in chunks(ids_str):
-        ph = ",".join(["?"] * len(part))
-        q = f"""
-        SELECT {select_cols}
-        FROM osm_building_link
-        WHERE osm_way_id IN ({ph})
-        """
-        rows = cur_src.execute(q, part).fetchall()
-        if not rows:
-            continue
-
-        ins_cols = ", ".join(["osm_way_id"] + FEATURE_COLS)
-        ins_ph = ", ".join(["?"] * (1 + len(FEATURE_COLS)))
-        ins_q = f"INSERT OR REPLACE INTO features({ins_cols}) VALUES ({ins_ph})"
 
+    # Stream the join into the insert in fixed-size batches; everything below runs
+    # in the single write transaction opened by the meta insert above.
+    rows = _bulk_select_by_ids(cur_src, "osm_building_link", "osm_way_id", ids_str, _MKDB_COLS)
+    while True:
+        chunk = list(itertools.islice(rows, _MKDB_INSERT_BATCH))
+        if not chunk:
+            break
         payload = []
-        for r in rows:
-            osm_way_id = str(r["osm_way_id"]).strip()
-            if not osm_way_id:
-                continue
-            payload.append([osm_way_id] + [r[c] for c in FEATURE_COLS])
-
+        for r in chunk:
+            osm_way_id = str(r[0]).strip()
+            if osm_way_id:
+                payload.append((osm_way_id, *r[1:]))
         if payload:
-            cur.executemany(ins_q, payload)
+            cur.executemany(_INSERT_FEATURES_SQL, payload)
             total_insert += len(payload)
 
     con.commit()
@@ -2524,72 +2928,69 @@ def load_feature_map_from_linkdb(*, linkdb_path: str, ids_str: list[str]):
     Returns:
         dict: feature_map keyed by osm_way_id string
     """
-    con = sqlite3.connect(linkdb_path)
-    con.row_factory = sqlite3.Row
-    cur = con.cursor()
+    with _ro_conn(linkdb_path, immutable=True) as con:
+        cur = con.cursor()
 
-    tables = _sqlite_list_tables(cur)
-    
-    # Detect actual table name (try in order)
-    target_table = None
-    for candidate in ["osm_building_link", "osm_building_link_local"]:
-        if candidate in tables:
-            target_table = candidate
-            break
-    
-    if not target_table:
-        con.close()
-        raise RuntimeError(f"[LINKDB] No valid feature table found in {linkdb_path}. tables={tables}")
-    
-    print(f"[LINKDB] Using table: {target_table}")
+        tables = _sqlite_list_tables(cur)
 
-    # ── TASK A: Detect available ID columns (osm_way_id PREFERRED, fallback osm_id) ──
-    cols = {r[1] for r in cur.execute(f"PRAGMA table_info('{target_table}');").fetchall()}
-    has_osm_id = "osm_id" in cols
-    has_osm_way_id = "osm_way_id" in cols
-    
-    if not has_osm_id and not has_osm_way_id:
-        con.close()
-        raise RuntimeError(f"[LINKDB] Table {target_table} has neither osm_id nor osm_way_id column")
-    
-    # Determine which column(s) to query (PREFER osm_way_id)
-    id_col_primary = "osm_way_id" if has_osm_way_id else "osm_id"
-    log_info(f"[FEATUREMAP] id_col_primary={id_col_primary} (has_osm_way_id={has_osm_way_id}, has_osm_id={has_osm_id})")
-
-    # Chunk IN query
-    def chunks(lst, n=900):
-        for i in range(0, len(lst), n):
-            yield lst[i:i+n]
-
-    feature_map = {}
-    for part in chunks(ids_str):
-        ph = ",".join(["?"] * len(part))
-        # Try primary column first
-        q = f"SELECT * FROM {target_table} WHERE {id_col_primary} IN ({ph})"
-        for r in cur.execute(q, part).fetchall():
-            row_dict = dict(r)
-            # ── TASK A: Dual-Key Strategy (PREFER osm_way_id) ──
-            # Store under BOTH osm_way_id and osm_id if both exist
-            k_way = _norm_id(row_dict.get("osm_way_id")) if has_osm_way_id else None
-            k_id = _norm_id(row_dict.get("osm_id")) if has_osm_id else None
-            
-            if k_way:
-                feature_map[k_way] = row_dict
-            if k_id and k_id not in feature_map:
-                feature_map[k_id] = row_dict
+        # Detect actual table name (try in order)
+        target_table = None
+        for candidate in ["osm_building_link", "osm_building_link_local"]:
+            if candidate in tables:
+                target_table = candidate
+                break
 
-    # ── SCHRITT 4: Feature-Map Proof ──
-    total_rows = 0
-    try:
-        total_rows = cur.execute(f"SELECT COUNT(*) FROM {target_table}").fetchone()[0]
-    except Exception:
-        pass
-    log_info(f"[FEATUREMAP] rows={total_rows} unique_keys={len(feature_map)}")
-    sample_fkeys = list(feature_map.keys())[:5]
-    log_info(f"[FEATUREMAP] sample_keys={sample_fkeys}")
+        if not target_table:
+            raise RuntimeError(f"[LINKDB] No valid feature table found in {linkdb_path}. tables={tables}")
 
-    con.close()
-    return feature_map
+        print(f"[LINKDB] Using table: {target_table}")
+
+        # ── TASK A: Detect available ID columns (osm_way_id PREFERRED, fallback osm_id) ──
+        cols = {r[1] for r in cur.execute(f"PRAGMA table_info('{target_table}');").fetchall()}
+        has_osm_id = "osm_id" in cols
+        has_osm_way_id = "osm_way_id" in cols
+
+        if not has_osm_id and not has_osm_way_id:
+            raise RuntimeError(f"[LINKDB] Table {target_table} has neither osm_id nor osm_way_id column")
+
+        # Determine which column(s) to query (PREFER osm_way_id)
+        id_col_primary = "osm_way_id" if has_osm_way_id else "osm_id"
+        log_info(f"[FEATUREMAP] id_col_primary={id_col_primary} (has_osm_way_id={has_osm_way_id}, has_osm_id={has_osm_id})")
+
+    # Index the id column (RW, outside the pooled read-only handle); this may
+    # rewrite the file, so the read below checks out a fresh connection.
+    _ensure_id_index(linkdb_path, target_table, id_col_primary, logger=log_info)
+
+    with _ro_conn(linkdb_path, immutable=True) as con:
+        cur = con.cursor()
+
+        feature_map = {}
+        with closing(_bulk_select_by_ids(cur, target_table, id_col_primary, ids_str)) as rows:
+            for r in rows:
+                # ── TASK A: Dual-Key Strategy (PREFER osm_way_id) ──
+                # Store under BOTH osm_way_id and osm_id if both exist (one shared dict)
+                k_way = _norm_id(r["osm_way_id"]) if has_osm_way_id else ""
+                k_id = _norm_id(r["osm_id"]) if has_osm_id else ""
+                if not (k_way or k_id):
+                    continue
+
+                row_dict = dict(r)
+                if k_way:
+                    feature_map[k_way] = row_dict
+                if k_id and k_id not in feature_map:
+                    feature_map[k_id] = row_dict
+
+        # ── SCHRITT 4: Feature-Map Proof ──
+        total_rows = 0
+        try:
+            total_rows = cur.execute(f"SELECT COUNT(*) FROM {target_table}").fetchone()[0]
+        except Exception:
+            pass
+        log_info(f"[FEATUREMAP] rows={total_rows} unique_keys={len(feature_map)}")
+        sample_fkeys = list(feature_map.keys())[:5]
+        log_info(f"[FEATUREMAP] sample_keys={sample_fkeys}")
+
+        return feature_map
 
 
 _GPKG_SCHEMA_DUMPED = False
@@ -2608,30 +3009,26 @@ def _debug_dump_gpkg_schema(gpkg_path):
         return
     _GPKG_SCHEMA_DUMPED = True
 
-    import sqlite3
     try:
-        con = sqlite3.connect(gpkg_path)
-        cur = con.cursor()
-        tables = _sqlite_list_tables(cur)
-        print(f"[GPKG_SCHEMA] path={gpkg_path}")
-        print(f"[GPKG_SCHEMA] tables_total={len(tables)}")
-
-        candidate_names = []
-        for tbl in tables:
-            col_names = {r[1] for r in cur.execute(
-                f"PRAGMA table_info('{tbl}');").fetchall()}
-            id_cols = sorted({"osm_id", "osm_way_id"} & col_names)
-            feat_cols = sorted(_GPKG_FEATURE_COLS & col_names)
-            is_candidate = bool(id_cols) and len(feat_cols) >= 2
-            if id_cols or feat_cols:
-                tag = "YES" if is_candidate else "NO"
-                print(f"[GPKG_SCHEMA] table={tbl} candidate={tag} "
-                      f"id_cols={id_cols} feat_cols={feat_cols}")
-            if is_candidate:
-                candidate_names.append(tbl)
-
-        print(f"[GPKG_SCHEMA] candidates={candidate_names}")
-        con.close()
+        with _ro_conn(gpkg_path) as con:
+            cur = con.cursor()
+            table_cols = _sqlite_table_columns(cur)
+            print(f"[GPKG_SCHEMA] path={gpkg_path}")
+            print(f"[GPKG_SCHEMA] tables_total={len(table_cols)}")
+
+            candidate_names = []
+            for tbl, col_names in table_cols.items():
+                id_cols = sorted({"osm_id", "osm_way_id"} & col_names)
+                feat_cols = sorted(_GPKG_FEATURE_COLS & col_names)
+                is_candidate = bool(id_cols) and len(feat_cols) >= 2
+                if id_cols or feat_cols:
+                    tag = "YES" if is_candidate else "NO"
+                    print(f"[GPKG_SCHEMA] table={tbl} candidate={tag} "
+                          f"id_cols={id_cols} feat_cols={feat_cols}")
+                if is_candidate:
+                    candidate_names.append(tbl)
+
+            print(f"[GPKG_SCHEMA] candidates={candidate_names}")
     except Exception as ex:
         print(f"[GPKG_SCHEMA] ERROR dumping schema: {ex}")
 
@@ -2649,102 +3046,90 @@ def load_feature_map_from_gpkg(gpkg_path: str, ids_str: list[str], prefer_id_col
 
     Returns:
         dict keyed by _norm_id(osm_id) -> row-dict with feature columns.
-    """
-    import sqlite3
 
-    con = sqlite3.connect(gpkg_path)
-    con.row_factory = sqlite3.Row
-    cur = con.cursor()
-
-    tables = _sqlite_list_tables(cur)
-
-    # ── Score each table: must have an ID col + >=2 feature cols ──
-    candidates = []  # (table_name, id_col, matched_feature_cols)
-    table_info = []  # for error reporting
-    for tbl in tables:
-        col_info = cur.execute(f"PRAGMA table_info('{tbl}');").fetchall()
-        col_names = {r[1] for r in col_info}
-
-        # Determine ID column (prefer prefer_id_col if specified, else osm_id)
-        if prefer_id_col and prefer_id_col in col_names:
-            id_col = prefer_id_col
-            log_info(f"[PHASE4][GPKG] table={tbl} id_col={id_col} (from prefer_id_col)")
-        elif "osm_id" in col_names:
-            id_col = "osm_id"
-            if prefer_id_col:
-                log_warn(f"[PHASE4][GPKG] table={tbl} prefer_id_col={prefer_id_col} not in columns, falling back to osm_id")
-        elif "osm_way_id" in col_names:
-            id_col = "osm_way_id"
-        else:
-            id_col = None
+    All ids are fetched per table in one TEMP-table join (_bulk_select_by_ids);
+    the pooled _ro_conn handle carries the cache_size/mmap_size/temp_store pragmas.
+    """
+    with _ro_conn(gpkg_path) as con:
+        cur = con.cursor()
 
-        matched = _GPKG_FEATURE_COLS & col_names
-        if id_col and len(matched) >= 2:
-            candidates.append((tbl, id_col, matched))
-        # Compact info for error message (only tables with at least an id or feature col)
-        if id_col or matched:
-            table_info.append(f"{tbl}(id={id_col}, feat={sorted(matched)})")
+        table_cols = _sqlite_table_columns(cur)
+        tables = list(table_cols)
+
+        # ── Score each table: must have an ID col + >=2 feature cols ──
+        candidates = []  # (table_name, id_col, matched_feature_cols)
+        table_info = []  # for error reporting
+        for tbl, col_names in table_cols.items():
+
+            # Determine ID column (prefer prefer_id_col if specified, else osm_id)
+            if prefer_id_col and prefer_id_col in col_names:
+                id_col = prefer_id_col
+                log_info(f"[PHASE4][GPKG] table={tbl} id_col={id_col} (from prefer_id_col)")
+            elif "osm_id" in col_names:
+                id_col = "osm_id"
+                if prefer_id_col:
+                    log_warn(f"[PHASE4][GPKG] table={tbl} prefer_id_col={prefer_id_col} not in columns, falling back to osm_id")
+            elif "osm_way_id" in col_names:
+                id_col = "osm_way_id"
+            else:
+                id_col = None
+
+            matched = _GPKG_FEATURE_COLS & col_names
+            if id_col and len(matched) >= 2:
+                candidates.append((tbl, id_col, matched))
+            # Compact info for error message (only tables with at least an id or feature col)
+            if id_col or matched:
+                table_info.append(f"{tbl}(id={id_col}, feat={sorted(matched)})")
+
+        if not candidates:
+            raise RuntimeError(
+                f"[PHASE4][GPKG] No candidate tables with required columns in "
+                f"{gpkg_path}. scanned={table_info or tables}"
+            )
 
-    if not candidates:
-        con.close()
-        raise RuntimeError(
-            f"[PHASE4][GPKG] No candidate tables with required columns in "
-            f"{gpkg_path}. scanned={table_info or tables}"
-        )
+        # Sort by number of matched feature columns descending (best first)
+        candidates.sort(key=lambda c: len(c[2]), reverse=True)
 
-    # Sort by number of matched feature columns descending (best first)
-    candidates.sort(key=lambda c: len(c[2]), reverse=True)
+        # ── Fetch rows from best candidate(s), merge "first non-empty wins" ──
+        feature_map: dict[str, dict] = {}
 
-    # ── Fetch rows from best candidate(s), merge "first non-empty wins" ──
-    feature_map: dict[str, dict] = {}
+        for tbl, id_col, matched_cols in candidates:
+            select_cols = [id_col] + sorted(matched_cols)
+            # Positional access: column 0 is the id, the rest follow select_cols order
+            col_pos = tuple((c, i) for i, c in enumerate(select_cols) if i)
 
-    for tbl, id_col, matched_cols in candidates:
-        select_cols = [id_col] + sorted(matched_cols)
-        cols_sql = ", ".join(f'"{c}"' for c in select_cols)
+            rows_fetched = 0
+            # Debug: Log the query strategy on first table
+            if tbl == candidates[0][0]:
+                print(f"[PHASE4][GPKG] Querying table={tbl}")
+                print(f"[PHASE4][GPKG] id_col={id_col} (prefer_id_col={prefer_id_col})")
+                print(f"[PHASE4][GPKG] rows_requested={len(ids_str)}")
 
-        def _chunks(lst, n=500):
-            for i in range(0, len(lst), n):
-                yield lst[i:i + n]
+            with closing(_bulk_select_by_ids(cur, tbl, id_col, ids_str, select_cols)) as rows:
+                for r in rows:
+                    key = _norm_id(r[0])
+                    if not key:
+                        continue
+                    rows_fetched += 1
+                    existing = feature_map.get(key)
+                    if existing is not None:
+                        for col, i in col_pos:
+                            if not existing.get(col) and r[i]:
+                                existing[col] = r[i]
+                    else:
+                        feature_map[key] = {col: r[i] for col, i in col_pos}
 
-        rows_fetched = 0
-        # Debug: Log the query strategy on first table
-        if tbl == candidates[0][0]:
-            print(f"[PHASE4][GPKG] Querying table={tbl}")
-            print(f"[PHASE4][GPKG] id_col={id_col} (prefer_id_col={prefer_id_col})")
-            print(f"[PHASE4][GPKG] rows_requested={len(ids_str)}")
-        
-        for part in _chunks(ids_str):
-            ph = ",".join(["?"] * len(part))
-            q = f'SELECT {cols_sql} FROM "{tbl}" WHERE "{id_col}" IN ({ph})'
-            for r in cur.execute(q, part).fetchall():
-                row_dict = dict(r)
-                key = _norm_id(row_dict.get(id_col))
-                if not key:
-                    continue
-                rows_fetched += 1
-                if key in feature_map:
-                    existing = feature_map[key]
-                    for col in matched_cols:
-                        if not existing.get(col) and row_dict.get(col):
-                            existing[col] = row_dict[col]
-                else:
-                    feature_map[key] = {
-                        col: row_dict.get(col, "") for col in matched_cols
-                    }
-
-        sample_keys = list(feature_map.keys())[:3]
-        print(
-            f"[PHASE4] feature_source=GPKG gpkg={gpkg_path} table={tbl} "
-            f"id_col={id_col} rows={rows_fetched} unique_keys={len(feature_map)}"
-        )
-        print(f"[PHASE4] sample_keys={sample_keys}")
+            sample_keys = list(feature_map.keys())[:3]
+            print(
+                f"[PHASE4] feature_source=GPKG gpkg={gpkg_path} table={tbl} "
+                f"id_col={id_col} rows={rows_fetched} unique_keys={len(feature_map)}"
+            )
+            print(f"[PHASE4] sample_keys={sample_keys}")
 
-        # If best table already delivered rows, no need to scan more tables
-        if feature_map:
-            break
+            # If best table already delivered rows, no need to scan more tables
+            if feature_map:
+                break
 
-    con.close()
-    
     # Final summary log
     log_info(
         f"[PHASE4][GPKG] FINAL: {len(feature_map)} features loaded "
@@ -2766,30 +3151,20 @@ def load_feature_map_from_mkdb(*, mkdb_path: str, ids_str: list[str]):
     Returns:
         dict: feature_map keyed by osm_way_id string
     """
-    con = sqlite3.connect(mkdb_path)
-    con.row_factory = sqlite3.Row
-    cur = con.cursor()
+    with _ro_conn(mkdb_path, immutable=True) as con:
+        cur = con.cursor()
 
-    tables = _sqlite_list_tables(cur)
-    if "features" not in tables:
-        con.close()
-        raise RuntimeError(f"[MKDB] missing 'features' in {mkdb_path}. tables={tables}")
-
-    # Chunk IN query
-    def chunks(lst, n=900):
-        for i in range(0, len(lst), n):
-            yield lst[i:i+n]
-
-    feature_map = {}
-    for part in chunks(ids_str):
-        ph = ",".join(["?"] * len(part))
-        q = f"SELECT * FROM features WHERE osm_way_id IN ({ph})"
-        for r in cur.execute(q, part).fetchall():
-            k = str(r["osm_way_id"]).strip()
-            if k:
-                feature_map[k] = dict(r)
+        tables = _sqlite_list_tables(cur)
+        if "features" not in tables:
+            raise RuntimeError(f"[MKDB] missing 'features' in {mkdb_path}. tables={tables}")
+
+        feature_map = {}
+        with closing(_bulk_select_by_ids(cur, "features", "osm_way_id", ids_str)) as rows:
+            for r in rows:
+                k = str(r["osm_way_id"]).strip()
+                if k:
+                    feature_map[k] = dict(r)
 
-    con.close()
     return feature_map
 
 
@@ -2823,6 +3198,9 @@ def _table_exists(cur, table_name: str) -> bool:
     return row is not None
 
 
+_INVALID_FACE_VALS = frozenset((None, 0, "0", ""))
+
+
 def _face_key_from_osm_id_int(face_val) -> str:
     """
     Convert face osm_id_int attribute value to string key for feature lookup.
@@ -2836,7 +3214,7 @@ def _face_key_from_osm_id_int(face_val) -> str:
     Returns:
         str: Normalized key as string, or empty string if invalid
     """
-    if face_val in (None, 0, "0", ""):
+    if face_val in _INVALID_FACE_VALS:
         return ""
     normed = _norm_id(face_val)
     if normed is None or normed == "" or normed == "0":
@@ -2845,13 +3223,10 @@ def _face_key_from_osm_id_int(face_val) -> str:
 
 
 # ── P4 HELPERS: Blender 4.5 STRING attributes require bytes ──
-def _key_to_str(v):
-    """Convert any face attribute value to a clean string key for dict lookup."""
-    if v is None:
-        return None
-    if isinstance(v, (bytes, bytearray)):
-        v = v.decode("utf-8", errors="replace")
-    return str(v)
+@functools.lru_cache(maxsize=8192)
+def _encode_attr_str(v):
+    """UTF-8 encode a feature value once per distinct string (values repeat heavily)."""
+    return v.encode("utf-8", errors="replace")
 
 
 def _to_attr_bytes(v):
@@ -2860,13 +3235,81 @@ def _to_attr_bytes(v):
     """
     if v is None:
         return b""
+    t = type(v)
+    if t is str:  # dominant case; exact type check before the isinstance chain
+        if not v or v == "None":
+            return b""
+        return _encode_attr_str(v)
+    if t is bytes:
+        return v
     if isinstance(v, (bytes, bytearray)):
         return bytes(v)
     if isinstance(v, str):
-        if v == "None":
-            return b""
-        return v.encode("utf-8", errors="replace")
-    return str(v).encode("utf-8", errors="replace")
+        return b"" if v == "None" else _encode_attr_str(str(v))
+    return _encode_attr_str(str(v))
+
+
+def _feature_columns(feature_by_uidx, cols):
+    """Transpose per-id feature rows into per-column lists of attribute bytes (SoA).
+    Each row is visited once. Every column list has len(feature_by_uidx) + 1
+    entries; the trailing b"" slot is used for unlinked faces and misses.
+    Returns (col_vals, str_count_by_uidx) with the non-empty value count per id.
+    """
+    n = len(feature_by_uidx)
+    col_lists = [[b""] * (n + 1) for _ in cols]
+    str_count_by_uidx = [0] * n
+    # Rows that carry every column (linkdb/mkdb) are unpacked in one C call;
+    # partial rows (GPKG) fall back to .get with a "" default.
+    getter = operator.itemgetter(*cols) if len(cols) > 1 else None
+    for u, feature in enumerate(feature_by_uidx):
+        if not feature:
+            continue
+        row_vals = None
+        if getter is not None:
+            try:
+                row_vals = getter(feature)
+            except KeyError:
+                pass
+        if row_vals is None:
+            row_vals = [feature.get(col, "") for col in cols]
+        cnt = 0
+        for val, vals in zip(row_vals, col_lists):
+            enc = _to_attr_bytes(val)  # FIX: must be bytes for Blender 4.5
+            if enc:
+                vals[u] = enc
+                cnt += 1
+        str_count_by_uidx[u] = cnt
+    return dict(zip(cols, col_lists)), str_count_by_uidx
+
+
+def _write_face_string_attr(attr, values):
+    """Write a full per-face column of bytes to a STRING attribute.
+    Tries one foreach_set call; Blender builds whose foreach_set rejects string
+    properties fall back to a single assignment pass over the prebuilt column.
+    """
+    data = attr.data
+    try:
+        data.foreach_set("value", values)
+        return
+    except (TypeError, RuntimeError):
+        pass
+    for i, v in enumerate(values):
+        data[i].value = v
+
+
+def _read_face_string_attr(attr):
+    """Read a full per-face column of raw values from a STRING attribute.
+    Counterpart of _write_face_string_attr: one foreach_get call where the build
+    supports string properties, otherwise a single comprehension over attr.data.
+    """
+    data = attr.data
+    values = np.empty(len(data), dtype=object)
+    try:
+        data.foreach_get("value", values)
+        return values.tolist()
+    except (TypeError, RuntimeError):
+        pass
+    return [d.value for d in data]
 
 
 def _materialize_osm_features(mesh, osm_id_attr, gpkg_path):
@@ -2881,9 +3324,6 @@ def _materialize_osm_features(mesh, osm_id_attr, gpkg_path):
     Returns:
         Number of faces with non-empty OSM name written
     """
-    from pathlib import Path
-    import sqlite3
-
     mesh_name = getattr(mesh, "name", "<unknown>")
     print(f"\n[PHASE4_ENTER] _materialize_osm_features CALLED for mesh={mesh_name}")
 
@@ -2958,14 +3398,16 @@ def _materialize_osm_features(mesh, osm_id_attr, gpkg_path):
     if osm_key_col and primary_id_name != osm_key_col:
         log_warn(f"[Phase4][GUARD] osm_key_col={osm_key_col} but primary_id_attr={primary_id_name} — may cause key mismatch!")
         print(f"[Phase4][GUARD] WARNING: osm_key_col={osm_key_col} != primary_id_attr={primary_id_name}")
-    # Sample first non-zero value from primary ID for type proof
-    _sample_id_val = None
-    for _si in range(min(20, face_count)):
-        _sv = id_attr.data[_si].value
-        if _sv and _sv != 0:
-            _sample_id_val = _sv
-            break
-    print(f"[Phase4][Guard] primary_id sample value={_sample_id_val!r} type={type(_sample_id_val).__name__}")
+    # Single foreach_get read of the face ids; every step below reuses this array
+    face_ids = _batch_read_face_ids(mesh)
+    linked = face_ids != ""
+    linked_idx = np.flatnonzero(linked)
+
+    # Sample first non-zero id among the first 20 faces for type proof
+    _sample_nz = np.flatnonzero(linked[:20])
+    _sample_id_val = face_ids[_sample_nz[0]] if _sample_nz.size else None
+    print(f"[Phase4][Guard] primary_id sample value={_sample_id_val!r} type={type(_sample_id_val).__name__} "
+          f"attr_type={id_attr.data_type}")
 
     # Legacy attribute resolution (for backwards compat)
     if osm_id_attr_str and (osm_id_attr_str.domain != "FACE" or osm_id_attr_str.data_type != "STRING"):
@@ -2973,44 +3415,33 @@ def _materialize_osm_features(mesh, osm_id_attr, gpkg_path):
 
     # ========================================
     # FORENSIC: Select probe face (first with osm_id != 0)
-    # Use robust _norm_id to read ID values
     # ========================================
     probe_face_idx = None
     probe_osm_id = None
-    for poly in mesh.polygons:
-        idx = poly.index
-        osm_id = _safe_read_face_id_attr(mesh, idx)
-        if osm_id:
-            probe_face_idx = idx
-            probe_osm_id = osm_id
-            break
+    if linked_idx.size:
+        probe_face_idx = int(linked_idx[0])
+        probe_osm_id = face_ids[probe_face_idx]
 
     if probe_face_idx is not None:
         print(f"\n[M1DC P4 PROBE] mesh={mesh_name} probe_face={probe_face_idx} osm_id={probe_osm_id}")
     else:
         print(f"\n[M1DC P4 PROBE] mesh={mesh_name} NO FACE WITH osm_id > 0 FOUND!")
 
-    # Step 1: Collect unique osm_id values from faces via _safe_read_face_id_attr
+    # Step 1: Collect unique osm_id values from the batched face id array
     print("[OSM Features] Collecting unique osm_id values from faces...")
-    unique_ids = set()
-    faces_with_link = 0
-    for poly in mesh.polygons:
-        k = _safe_read_face_id_attr(mesh, poly.index)
-        if k:
-            unique_ids.add(k)
-            faces_with_link += 1
+    faces_with_link = int(linked_idx.size)
+    # link_uidx[j] = position in ids_str of the id on face linked_idx[j]
+    uniq, link_uidx = np.unique(face_ids[linked_idx], return_inverse=True)
+    ids_str = uniq.tolist()
 
-    sample_ids = list(unique_ids)[:10]
-    print(f"[P4][ID_SCAN] mesh={mesh_name} faces={face_count} faces_with_link={faces_with_link} unique_ids={len(unique_ids)}")
+    sample_ids = ids_str[:10]
+    print(f"[P4][ID_SCAN] mesh={mesh_name} faces={face_count} faces_with_link={faces_with_link} unique_ids={len(ids_str)}")
     print(f"[P4][ID_SCAN] sample_ids_requested={sample_ids}")
 
-    if not unique_ids:
+    if not ids_str:
         log_warn("[Materialize] no ids to materialize (unique_osm_id == 0)")
         return 0
 
-    # Convert to list for processing
-    ids_str = list(unique_ids)
-
     # ========================================
     # LINKDB PATH RESOLUTION via _resolve_feature_db_path (FIX2)
     # ========================================
@@ -3089,11 +3520,10 @@ def _materialize_osm_features(mesh, osm_id_attr, gpkg_path):
 
         # Show source tables for diagnosis
         try:
-            con_diag = sqlite3.connect(_feat_db)
-            cur_diag = con_diag.cursor()
-            tables = _sqlite_list_tables(cur_diag)
+            # Pooled read-only handle: reuses the connection the loader just released
+            with _ro_conn(_feat_db) as con_diag:
+                tables = _sqlite_list_tables(con_diag.cursor())
             log_error(f"[PHASE4] Available tables in {feature_source}: {tables}")
-            con_diag.close()
         except Exception as ex:
             log_error(f"[PHASE4] Cannot open {_feat_db} for diagnosis: {ex}")
 
@@ -3147,10 +3577,6 @@ def _materialize_osm_features(mesh, osm_id_attr, gpkg_path):
     elif has_feature_attr.domain != "FACE" or has_feature_attr.data_type != "INT":
         mesh.attributes.remove(has_feature_attr)
         has_feature_attr = mesh.attributes.new("has_feature", "INT", "FACE")
-    # FIX2: Length guard
-    if has_feature_attr and len(has_feature_attr.data) != face_count:
-        print(f"[P4][SKIP] has_feature attr_len={len(has_feature_attr.data)} face_count={face_count}")
-        has_feature_attr = None
 
     # Build attr_mapping: STRING attributes WITHOUT osm_ prefix
     # Column name in feature source -> attribute name on mesh
@@ -3173,7 +3599,7 @@ def _materialize_osm_features(mesh, osm_id_attr, gpkg_path):
 
     print(f"[OSM Features] Will create STRING attrs for: {list(attr_mapping.values())[:10]}...")
 
-    # Create attributes if missing (with length guard - FIX2)
+    # Create attributes if missing (length guard happens once, in the refresh below - FIX2)
     attr_handles = {}
     for feature_col, attr_name in attr_mapping.items():
         attr = mesh.attributes.get(attr_name)
@@ -3185,131 +3611,103 @@ def _materialize_osm_features(mesh, osm_id_attr, gpkg_path):
             attr = mesh.attributes.new(attr_name, "STRING", "FACE")
             print(f"[OSM Features] Recreated attribute: {attr_name}")
 
-        # FIX2: Length guard - skip attr if data length mismatch
-        if attr and len(attr.data) != face_count:
-            print(f"[P4][SKIP] attr={attr_name} attr_len={len(attr.data)} face_count={face_count} reason=attr_len_mismatch")
-            attr = None
-        attr_handles[feature_col] = attr
-
     # ── CRITICAL: Re-resolve ALL attribute handles after bulk creation ──
     # Adding attributes to a mesh invalidates existing bpy_prop_collection
     # references (Blender 4.x API caveat). Re-fetch every handle to get fresh
     # pointers that correctly reflect the final attribute layout.
+    # Every handle kept here satisfies len(attr.data) == face_count, so the
+    # bulk writes below need no per-face bounds checks.
     has_feature_attr = mesh.attributes.get("has_feature")
-    if has_feature_attr and (has_feature_attr.domain != "FACE" or has_feature_attr.data_type != "INT" or len(has_feature_attr.data) != face_count):
+    if has_feature_attr and (has_feature_attr.domain != "FACE" or has_feature_attr.data_type != "INT"):
+        has_feature_attr = None
+    if has_feature_attr and len(has_feature_attr.data) != face_count:
+        print(f"[P4][SKIP] has_feature attr_len={len(has_feature_attr.data)} face_count={face_count}")
         has_feature_attr = None
     for feature_col, attr_name in attr_mapping.items():
         attr = mesh.attributes.get(attr_name)
-        if attr and attr.domain == "FACE" and attr.data_type == "STRING" and len(attr.data) == face_count:
-            attr_handles[feature_col] = attr
-        else:
-            attr_handles[feature_col] = None
+        if attr and attr.domain == "FACE" and attr.data_type == "STRING":
+            attr_len = len(attr.data)
+            if attr_len == face_count:
+                attr_handles[feature_col] = attr
+                continue
+            # FIX2: Length guard - skip attr if data length mismatch
+            print(f"[P4][SKIP] attr={attr_name} attr_len={attr_len} face_count={face_count} reason=attr_len_mismatch")
+        attr_handles[feature_col] = None
     _valid_handles = sum(1 for v in attr_handles.values() if v is not None)
     print(f"[P4][ATTR_REFRESH] Re-resolved {_valid_handles}/{len(attr_handles)} attr handles + has_feature={'OK' if has_feature_attr else 'MISSING'}")
 
     # Step 6: Write features to FACE attributes
     print("[OSM Features] Writing features to FACE attributes...")
 
-    written_count = 0
-    probe_write_logged = False
-
-    # Hit/Miss counters and samples
-    features_hit = 0
-    features_miss = 0
-    faces_checked = 0
-    strings_written = 0  # Count of non-empty STRING values written
+    live_handles = tuple((col, attr) for col, attr in attr_handles.items() if attr is not None)
+
+    # One dict lookup per unique id; faces index into it via link_uidx
+    feature_by_uidx = [features.get(k) for k in ids_str]
+
+    # face -> unique-id index; unlinked faces point at the trailing "no feature" slot
+    face_uidx = np.full(face_count, len(ids_str), dtype=np.intp)
+    face_uidx[linked_idx] = link_uidx
+    present_by_uidx = np.array([bool(f) for f in feature_by_uidx] + [False], dtype=bool)
+    # PROOF: has_feature=1 means lookup succeeded
+    has_feat = present_by_uidx[face_uidx].astype(np.int32)
+
+    # Columnar (SoA) values per unique id, encoded once
+    col_vals, str_count_by_uidx = _feature_columns(feature_by_uidx, tuple(col for col, _attr in live_handles))
+
+    # ── Hit/Miss counters and samples, derived from the per-id arrays ──
+    # Unlinked faces keep the defaults, so only linked faces count.
+    faces_checked = face_count
+    faces_per_uidx = np.bincount(link_uidx, minlength=len(ids_str))
+    link_present = present_by_uidx[link_uidx]
+    hit_faces = linked_idx[link_present]
+    miss_faces = linked_idx[~link_present]
+    features_hit = int(hit_faces.size)
+    features_miss = int(miss_faces.size)
+    strings_written = int(np.dot(faces_per_uidx, str_count_by_uidx))  # non-empty STRING values written
+    # Count faces with non-empty name
+    written_count = int(np.dot(faces_per_uidx, [1 if f and f.get("name", "") else 0 for f in feature_by_uidx]))
+
+    sample_face_osm_ids = [face_ids[i] for i in linked_idx[:10].tolist()]
+    miss_samples = [face_ids[i] for i in miss_faces[:10].tolist()]
     hit_samples = []
-    miss_samples = []
-    sample_face_osm_ids = []
-
-    for poly in mesh.polygons:
-        idx = poly.index
-        faces_checked += 1
-        
-        # Robust ID read via _safe_read_face_id_attr (FIX2)
-        osm_id = _safe_read_face_id_attr(mesh, idx)
-
-        if not osm_id:
-            # No link, write empty bytes to all attrs + has_feature=0
-            if has_feature_attr:
-                has_feature_attr.data[idx].value = 0
-            for attr in attr_handles.values():
-                if attr and idx < len(attr.data):
-                    attr.data[idx].value = b""  # FIX: Blender 4.5 STRING attrs require bytes
-            continue
-
-        # Record sample face osm_ids (first 10)
-        if len(sample_face_osm_ids) < 10:
-            sample_face_osm_ids.append(osm_id)
-
-        # ── P4 FIX: Ensure lookup key is str (features dict keys are always str via _norm_id) ──
-        feature = features.get(_key_to_str(osm_id) if not isinstance(osm_id, str) else osm_id)
-
-        if not feature:
-            # MISS: Link exists but no feature row found in source
-            features_miss += 1
-            if len(miss_samples) < 10:
-                miss_samples.append(osm_id)
-            
-            # DIAGNOSTIC: Log first few misses to debug normalization
-            if features_miss <= 3:
-                print(f"\n[MATERIALIZE_DIAGNOSTIC] MISS: mesh={mesh_name} face={idx} osm_id={osm_id} type={type(osm_id).__name__}")
-                print(f"  Looking for key='{osm_id}' in features dict")
-                print(f"  Features dict has {len(features)} entries")
-                sample_keys_in_dict = list(features.keys())[:5]
-                print(f"  Sample keys in dict: {sample_keys_in_dict}")
-                # Type proof: compare key types
-                if sample_keys_in_dict:
-                    print(f"  Dict key type={type(sample_keys_in_dict[0]).__name__} face key type={type(osm_id).__name__}")
-            
-            if has_feature_attr:
-                has_feature_attr.data[idx].value = 0
-            for attr in attr_handles.values():
-                if attr and idx < len(attr.data):
-                    attr.data[idx].value = b""  # FIX: Blender 4.5 STRING attrs require bytes
-            continue
-
-        # HIT: Found feature row
-        features_hit += 1
-        if has_feature_attr:
-            has_feature_attr.data[idx].value = 1  # PROOF: has_feature=1 means lookup succeeded
-        if len(hit_samples) < 10:
-            hit_samples.append((osm_id, feature.get("building", ""), feature.get("amenity", "")))
-
-        # Write feature attributes from row
-        for gpkg_col, attr in attr_handles.items():
-            if attr is None or idx >= len(attr.data):
-                continue
-            val = feature.get(gpkg_col, "")
-            attr.data[idx].value = _to_attr_bytes(val)  # FIX: must be bytes for Blender 4.5
-            if val and str(val).strip():
-                strings_written += 1
-
-        # [P4][PROOF] One-shot diagnostic on first hit
-        if features_hit == 1:
-            print(f"[P4][PROOF] raw_id={osm_id} type={type(osm_id).__name__} "
-                  f"hit=True sample_feature_keys={list(features.keys())[:3]}")
+    for i in hit_faces[:10].tolist():
+        feature = feature_by_uidx[face_uidx[i]]
+        hit_samples.append((face_ids[i], feature.get("building", ""), feature.get("amenity", "")))
+
+    # DIAGNOSTIC: Log first few misses to debug normalization
+    for idx in miss_faces[:3].tolist():
+        osm_id = face_ids[idx]
+        print(f"\n[MATERIALIZE_DIAGNOSTIC] MISS: mesh={mesh_name} face={idx} osm_id={osm_id} type={type(osm_id).__name__}")
+        print(f"  Looking for key='{osm_id}' in features dict")
+        print(f"  Features dict has {len(features)} entries")
+        sample_keys_in_dict = list(features.keys())[:5]
+        print(f"  Sample keys in dict: {sample_keys_in_dict}")
+        # Type proof: compare key types
+        if sample_keys_in_dict:
+            print(f"  Dict key type={type(sample_keys_in_dict[0]).__name__} face key type={type(osm_id).__name__}")
+
+    # [P4][PROOF] One-shot diagnostic on first hit
+    if features_hit:
+        osm_id = face_ids[int(hit_faces[0])]
+        print(f"[P4][PROOF] raw_id={osm_id} type={type(osm_id).__name__} "
+              f"hit=True sample_feature_keys={list(features.keys())[:3]}")
 
-        # ========================================
-        # FORENSIC: Log probe face STRING writes
-        # ========================================
-        if idx == probe_face_idx and not probe_write_logged:
-            print(f"\n[M1DC P4 WRITE] mesh={mesh_name} face={idx} osm_id={osm_id}")
-            # Verify what was written to key STRING attrs
-            for key in ["building", "amenity", "landuse"]:
-                if key in attr_handles:
-                    written_val = attr_handles[key].data[idx].value
-                    print(f"  osm_{key} (STRING) = '{written_val}'")
-            probe_write_logged = True
-
-        # Count faces with non-empty name
-        if feature.get("name", ""):
-            written_count += 1
-
-    try:
-        mesh.update()
-    except Exception:
-        pass
+    # ========================================
+    # FORENSIC: Log probe face STRING writes
+    # ========================================
+    if probe_face_idx is not None and has_feat[probe_face_idx]:
+        uidx = face_uidx[probe_face_idx]
+        print(f"\n[M1DC P4 WRITE] mesh={mesh_name} face={probe_face_idx} osm_id={probe_osm_id}")
+        # Show what goes into key STRING attrs
+        for key in ["building", "amenity", "landuse"]:
+            if key in col_vals:
+                print(f"  osm_{key} (STRING) = '{col_vals[key][uidx]}'")
+
+    # Bulk writeback: one call per attribute
+    if has_feature_attr:
+        has_feature_attr.data.foreach_set("value", has_feat)
+    for gpkg_col, attr in live_handles:
+        _write_face_string_attr(attr, np.array(col_vals[gpkg_col], dtype=object)[face_uidx].tolist())
 
     # ========================================
     # CRITICAL: Flush mesh attribute writes
@@ -3415,57 +3813,41 @@ def _materialize_osm_features(mesh, osm_id_attr, gpkg_path):
     # ── TASK C: 3-Face Stichprobe (Sample Proof) ──
     if features_hit > 0:
         log_info("[PHASE4][SAMPLE] 3-Face Proof:")
-        sample_count = 0
-        for poly in mesh.polygons:
-            idx = poly.index
-            # Robust ID read via _safe_read_face_id_attr (FIX2)
-            osm_id = _safe_read_face_id_attr(mesh, idx)
-            if not osm_id:
-                continue
-            
-            feature = features.get(osm_id)
-            if not feature:
-                continue
-            
-            # Found a hit, log it
-            building_val = attr_handles.get("building").data[idx].value if "building" in attr_handles else "__NULL__"
-            amenity_val = attr_handles.get("amenity").data[idx].value if "amenity" in attr_handles else "__NULL__"
-            name_val = attr_handles.get("name").data[idx].value if "name" in attr_handles else "__NULL__"
-            landuse_val = attr_handles.get("landuse").data[idx].value if "landuse" in attr_handles else "__NULL__"
-            
-            log_info(f"  face={idx} osm_key={osm_id} building={building_val!r} amenity={amenity_val!r} landuse={landuse_val!r} name={name_val!r}")
-            sample_count += 1
-            if sample_count >= 3:
-                break
+        # First 3 hit faces; values come from the write-side columns (no readback)
+        for idx in hit_faces[:3].tolist():
+            uidx = face_uidx[idx]
+            building_val, amenity_val, name_val, landuse_val = (
+                col_vals[c][uidx] if c in col_vals else "__NULL__"
+                for c in ("building", "amenity", "name", "landuse")
+            )
+            log_info(f"  face={idx} osm_key={face_ids[idx]} building={building_val!r} amenity={amenity_val!r} landuse={landuse_val!r} name={name_val!r}")
 
     print(f"[OSM Features] Writeback complete: {written_count} faces with name")
 
     # ========================================
     # ACCEPTANCE GATE: Verify at least one code > 0
     # ========================================
-    print("\n[M1DC Acceptance] Scanning for nonzero STRING values (first 5000 faces)...")
-    scan_limit = min(5000, face_count)
+    # Counted from the write-side column values (weighted by faces per unique id)
+    # instead of reading the STRING attributes back face by face.
+    print("\n[M1DC Acceptance] Counting nonzero STRING values from writeback columns...")
+    nonzero_ok = {b"": False}  # predicate memo per distinct bytes value
+
+    def _is_nonzero(v):
+        ok = nonzero_ok.get(v)
+        if ok is None:
+            cleaned = _bytes_to_clean_str(v)
+            ok = nonzero_ok[v] = bool(cleaned and cleaned != "__NULL__" and cleaned.strip())
+        return ok
+
     nonzero_found = {}
-    for i, poly in enumerate(mesh.polygons):
-        if i >= scan_limit:
-            break
-        idx = poly.index
-        for gpkg_col, attr_name in attr_mapping.items():
-            if gpkg_col not in attr_handles:
-                continue
-            attr = attr_handles[gpkg_col]
-            try:
-                val = attr.data[idx].value
-                # FIX: bytes-safe check for Blender 4.5 STRING attrs
-                cleaned = _bytes_to_clean_str(val) if val else ""
-                if cleaned and cleaned != "__NULL__" and cleaned.strip():
-                    if gpkg_col not in nonzero_found:
-                        nonzero_found[gpkg_col] = 0
-                    nonzero_found[gpkg_col] += 1
-            except Exception:
-                pass
-    
-    print(f"[M1DC Acceptance] nonzero STRING values (first {scan_limit} faces):")
+    n_uids = len(ids_str)
+    for gpkg_col, vals in col_vals.items():
+        mask = np.fromiter(map(_is_nonzero, vals[:n_uids]), dtype=bool, count=n_uids)
+        n = int(faces_per_uidx[mask].sum())
+        if n:
+            nonzero_found[gpkg_col] = n
+
+    print(f"[M1DC Acceptance] nonzero STRING values (all {face_count} faces):")
     for col, count in sorted(nonzero_found.items()):
         print(f"  {col}: {count} faces")
     
@@ -3500,6 +3882,7 @@ def _materialize_osm_features(mesh, osm_id_attr, gpkg_path):
     return written_count
 
 
+@functools.lru_cache(maxsize=128)
 def _get_osm_code_attr_name(key):
     """
     Convert feature key to mesh attribute name.
@@ -3512,6 +3895,7 @@ def _get_osm_code_attr_name(key):
     return f"osm_{key}_code"
 
 
+@functools.lru_cache(maxsize=128)
 def code_attr_to_feature_key(code_attr: str) -> str:
     """
     Normalize code attribute name to feature key.
@@ -3536,33 +3920,100 @@ def code_attr_to_feature_key(code_attr: str) -> str:
     return k
 
 
+@functools.lru_cache(maxsize=8)
+def _legend_code_plan(code_keys):
+    """
+    Per-key Phase 5 names, built once per CODE_KEYS tuple.
+
+    Returns:
+        tuple: (key, string_attr_name, code_attr_name, feature_key, cache_key) per key
+    """
+    plan = []
+    for key in code_keys:
+        code_attr_name = _get_osm_code_attr_name(key)  # osm_{key}_code
+        feature_key = code_attr_to_feature_key(code_attr_name)
+        # string attr: Phase 4 writes as "building", not "osm_building"
+        plan.append((key, key, code_attr_name, feature_key, f"{feature_key}_code"))
+    return tuple(plan)
+
+
 # ── P5 HELPER: Blender 4.5 STRING attributes return bytes ──
+_BYTES_REPR_PREFIXES = (b"b'", b'b"')
+
+
+@functools.lru_cache(maxsize=None)
+def _log_bytes_repr_artifact():
+    """Warn once that a STRING value arrived as a str() of bytes ("b'...'")."""
+    log_warn("[P5] STRING value looks like str(bytes) (\"b'...'\"); an upstream DB/cache layer "
+             "is stringifying bytes. Stripping the repr, but that layer should pass bytes through.")
+
+
+@functools.lru_cache(maxsize=8192)
+def _clean_attr_str(v):
+    """Decode/clean one bytes or str value once per distinct value; result is interned."""
+    if isinstance(v, bytes):
+        s = v.decode("utf-8", errors="replace")
+        if not v.startswith(_BYTES_REPR_PREFIXES):
+            # Real attribute bytes: no repr artifact possible, skip the detection block
+            if s == "" or s == "None":
+                return "__NULL__"
+            return sys.intern(s)
+    else:
+        s = v
+
+    # Handle string representation of bytes: "b'house'" or 'b"house"'
+    if s.startswith("b'") and s.endswith("'"):
+        _log_bytes_repr_artifact()
+        s = s[2:-1]
+    elif s.startswith('b"') and s.endswith('"'):
+        _log_bytes_repr_artifact()
+        s = s[2:-1]
+
+    if s == "" or s == "None":
+        return "__NULL__"
+    return sys.intern(s)
+
+
 def _bytes_to_clean_str(v):
     """Decode a Blender STRING attribute value (bytes in Blender 4.5) to a clean Python str.
     Returns '__NULL__' for None/empty/'None', otherwise the decoded string.
 
     Also handles the 'b\\'...\\'' string representation pattern from DB/cache.
+    Values repeat heavily across faces, so the work is memoized in _clean_attr_str.
     """
     if v is None:
         return "__NULL__"
-    if isinstance(v, (bytes, bytearray)):
-        try:
-            s = v.decode("utf-8", errors="replace")
-        except Exception:
-            s = str(v)
-    else:
-        s = str(v)
+    if isinstance(v, bytearray):
+        v = bytes(v)
+    elif type(v) is not str and not isinstance(v, bytes):
+        v = str(v)  # also normalizes str subclasses, which sys.intern rejects
+    return _clean_attr_str(v)
 
-    # Handle string representation of bytes: "b'house'" or 'b"house"'
-    if isinstance(s, str):
-        if s.startswith("b'") and s.endswith("'"):
-            s = s[2:-1]
-        elif s.startswith('b"') and s.endswith('"'):
-            s = s[2:-1]
 
-    if s == "" or s == "None":
-        return "__NULL__"
-    return s
+def _read_face_int_array(attr, face_count):
+    """Bulk-read an INT face attribute into an int32 array of exactly face_count
+    entries (truncated or zero-padded if the layer length disagrees).
+    """
+    values = np.empty(len(attr.data), dtype=np.int32)
+    attr.data.foreach_get("value", values)
+    if len(values) == face_count:
+        return values
+    out = np.zeros(face_count, dtype=np.int32)
+    n = min(face_count, len(values))
+    out[:n] = values[:n]
+    return out
+
+
+def _count_nonempty_str_values(values):
+    """Count STRING attribute values that clean to a non-blank string.
+    Distinct values are tallied first, so cleanup runs once per value.
+    """
+    n = 0
+    for v, cnt in Counter(values).items():
+        s = _bytes_to_clean_str(v)
+        if s != "__NULL__" and s.strip():
+            n += cnt
+    return n
 
 
 def _count_nonzero_int_attr(mesh, attr_name):
@@ -3583,14 +4034,16 @@ def _count_nonzero_int_attr(mesh, attr_name):
         return 0
     if a.domain != 'FACE' or a.data_type != 'INT':
         return 0
-    nz = 0
-    for i in range(len(mesh.polygons)):
-        try:
-            if a.data[i].value != 0:
-                nz += 1
-        except (IndexError, RuntimeError):
-            pass
-    return nz
+    try:
+        values = _read_face_int_array(a, len(mesh.polygons))
+    except (TypeError, RuntimeError):
+        return 0
+    return int(np.count_nonzero(values))
+
+
+# Phase 5 forensic output (cache dumps, probe face, samples, per-attr summary).
+# Off by default: set CITYGML_P5_DEBUG=1 to enable.
+_P5_DEBUG = os.environ.get("CITYGML_P5_DEBUG") == "1"
 
 
 def _materialize_legend_codes(mesh, gpkg_path, output_dir):
@@ -3610,16 +4063,18 @@ def _materialize_legend_codes(mesh, gpkg_path, output_dir):
     """
     from .pipeline.diagnostics.legend_encoding import (
         CODE_KEYS, get_legend_cache_dir, init_legend_caches,
-        legend_encode, legend_export_csv, _ENCODE_CACHE
+        legend_encode, legend_export_csv, _ENCODE_CACHE, _bytes_index
     )
 
     mesh_name = getattr(mesh, "name", "<unknown>")
-    print(f"\n[M1DC Phase5] Legend code writeback for mesh: {mesh_name}")
+    if _P5_DEBUG:
+        print(f"\n[M1DC Phase5] Legend code writeback for mesh: {mesh_name}")
 
     # CRITICAL: Initialize face_count FIRST — used everywhere below.
     # Previously this was set late, causing UnboundLocalError in forensic logging.
     face_count = len(mesh.polygons)
-    print(f"[M1DC Phase5] face_count={face_count}")
+    if _P5_DEBUG:
+        print(f"[M1DC Phase5] face_count={face_count}")
 
     # Get legends directory
     legends_dir = get_legend_cache_dir(output_dir)
@@ -3627,28 +4082,36 @@ def _materialize_legend_codes(mesh, gpkg_path, output_dir):
         print(f"[M1DC Phase5] Legends directory not found: {legends_dir}")
         return 0
 
-    print(f"[M1DC Phase5] Legends directory: {legends_dir}")
+    if _P5_DEBUG:
+        print(f"[M1DC Phase5] Legends directory: {legends_dir}")
 
-    # Find legend CSV files to determine table name
-    legend_files = sorted([f for f in os.listdir(legends_dir) if f.endswith("_legend.csv")])
+    # Find legend CSV files to determine table name (one directory pass; the
+    # *.csv listing is reused by the ACCEPT/PROOF checks at the end)
+    with os.scandir(legends_dir) as it:
+        csv_names = sorted(e.name for e in it if e.name.endswith(".csv") and e.is_file())
+    legend_files = [f for f in csv_names if f.endswith("_legend.csv")]
     if not legend_files:
         print("[M1DC Phase5] No legend files found")
         return 0
 
-    print(f"[M1DC Phase5] Found {len(legend_files)} legend files: {legend_files[:5]}...")
+    if _P5_DEBUG:
+        print(f"[M1DC Phase5] Found {len(legend_files)} legend files: {legend_files[:5]}...")
 
     # Extract table name from first legend file
     stem = legend_files[0].replace("_legend.csv", "")
-    print(f"[M1DC Phase5] First legend stem: {stem}")
+    if _P5_DEBUG:
+        print(f"[M1DC Phase5] First legend stem: {stem}")
     try:
         table_name, first_col = stem.rsplit("__", 1)
-        print(f"[M1DC Phase5] Parsed: table_name='{table_name}', first_col='{first_col}'")
+        if _P5_DEBUG:
+            print(f"[M1DC Phase5] Parsed: table_name='{table_name}', first_col='{first_col}'")
     except ValueError:
         print(f"[M1DC Phase5] Cannot parse table name from: {legend_files[0]}")
         print(f"[M1DC Phase5] Expected format: table__column_legend.csv (double underscore)")
         return 0
 
-    print(f"[M1DC Phase5] Using table: {table_name}")
+    if _P5_DEBUG:
+        print(f"[M1DC Phase5] Using table: {table_name}")
 
     # Initialize legend caches
     loaded = init_legend_caches(legends_dir, table_name)
@@ -3656,31 +4119,38 @@ def _materialize_legend_codes(mesh, gpkg_path, output_dir):
         print("[M1DC Phase5] No legend caches loaded")
         return 0
 
-    print(f"[M1DC Phase5] Loaded {loaded} legend caches")
+    if _P5_DEBUG:
+        print(f"[M1DC Phase5] Loaded {loaded} legend caches")
 
     # ========================================
     # FORENSIC: Dump cache keys and sample entries
     # ========================================
-    print(f"\n[M1DC FORENSIC] Cache dump after init_legend_caches:")
-    print(f"  _ENCODE_CACHE keys: {list(_ENCODE_CACHE.keys())}")
-    for cache_key in list(_ENCODE_CACHE.keys())[:3]:
-        cache = _ENCODE_CACHE.get(cache_key, {})
-        sample_entries = list(cache.items())[:5]
-        print(f"  {cache_key}: {len(cache)} entries, samples: {sample_entries}")
+    if _P5_DEBUG:
+        print(f"\n[M1DC FORENSIC] Cache dump after init_legend_caches:")
+        print(f"  _ENCODE_CACHE keys: {list(_ENCODE_CACHE.keys())}")
+        for cache_key in list(_ENCODE_CACHE.keys())[:3]:
+            cache = _ENCODE_CACHE.get(cache_key, {})
+            sample_entries = list(cache.items())[:5]
+            print(f"  {cache_key}: {len(cache)} entries, samples: {sample_entries}")
 
     # Find which STRING attributes exist on the mesh (Phase 4 writes without osm_ prefix)
     attrs_to_encode = []
-    print(f"[M1DC Phase5] Checking for STRING attributes (CODE_KEYS={CODE_KEYS[:5]}...)")
+    if _P5_DEBUG:
+        print(f"[M1DC Phase5] Checking for STRING attributes (CODE_KEYS={CODE_KEYS[:5]}...)")
 
-    for key in CODE_KEYS:
-        string_attr_name = key  # Phase 4 writes as "building", not "osm_building"
-        code_attr_name = _get_osm_code_attr_name(key)  # osm_{key}_code
+    # encode_plan adds the loop-invariant feature key + legend cache key per attribute
+    encode_plan = []
+    for plan_entry in _legend_code_plan(tuple(CODE_KEYS)):
+        key, string_attr_name, code_attr_name = plan_entry[:3]
         string_attr = mesh.attributes.get(string_attr_name)
         if string_attr and string_attr.domain == "FACE" and string_attr.data_type == "STRING":
             attrs_to_encode.append((key, string_attr_name, code_attr_name))
-            print(f"[M1DC Phase5]   Found STRING attr: {string_attr_name} -> will write {code_attr_name}")
+            encode_plan.append(plan_entry)
+            if _P5_DEBUG:
+                print(f"[M1DC Phase5]   Found STRING attr: {string_attr_name} -> will write {code_attr_name}")
 
-    print(f"[M1DC Phase5] Found {len(attrs_to_encode)} STRING attributes to encode")
+    if _P5_DEBUG:
+        print(f"[M1DC Phase5] Found {len(attrs_to_encode)} STRING attributes to encode")
 
     if not attrs_to_encode:
         print("[M1DC Phase5] WARNING: No STRING attributes found to encode!")
@@ -3707,118 +4177,126 @@ def _materialize_legend_codes(mesh, gpkg_path, output_dir):
         # ========================================
         # FORENSIC: Target attribute proof
         # ========================================
-        print(f"\n[M1DC P5 TARGET] mesh={mesh_name} key='{key}'")
-        print(f"  computed_target_attr='{code_name}'")
-        print(f"  target_exists={attr_existed}")
-        print(f"  code_attrs['{key}'] -> {code_attr.name if code_attr else 'None'}")
+        if _P5_DEBUG:
+            print(f"\n[M1DC P5 TARGET] mesh={mesh_name} key='{key}'")
+            print(f"  computed_target_attr='{code_name}'")
+            print(f"  target_exists={attr_existed}")
+            print(f"  code_attrs['{key}'] -> {code_attr.name if code_attr else 'None'}")
 
     # ========================================
     # FORENSIC FACE PROBE: Use same criteria as Phase 4 (osm_id_int > 0)
     # ========================================
-    print(f"\n[M1DC P5 PROBE] Looking for probe face (first with osm_id_int > 0)...")
-    osm_id_int_attr = mesh.attributes.get("osm_id_int")
-    building_attr = mesh.attributes.get("building")  # Phase 4 writes as "building" without osm_ prefix
-    osm_building_code_attr = code_attrs.get("building")
+    if _P5_DEBUG:
+        print(f"\n[M1DC P5 PROBE] Looking for probe face (first with osm_id_int > 0)...")
+        osm_id_int_attr = mesh.attributes.get("osm_id_int")
+        building_attr = mesh.attributes.get("building")  # Phase 4 writes as "building" without osm_ prefix
+        osm_building_code_attr = code_attrs.get("building")
+
+        probe_face_idx = None
+        probe_osm_id = None
+
+        if osm_id_int_attr and osm_id_int_attr.domain == "FACE":
+            for poly in mesh.polygons:
+                idx = poly.index
+                osm_id = osm_id_int_attr.data[idx].value
+                if osm_id > 0:
+                    probe_face_idx = idx
+                    probe_osm_id = osm_id
+                    break
 
-    probe_face_idx = None
-    probe_osm_id = None
+        if probe_face_idx is not None:
+            print(f"[M1DC P5 PROBE] mesh={mesh_name} probe_face={probe_face_idx} osm_id_int={probe_osm_id}")
 
-    if osm_id_int_attr and osm_id_int_attr.domain == "FACE":
-        for poly in mesh.polygons:
-            idx = poly.index
-            osm_id = osm_id_int_attr.data[idx].value
-            if osm_id > 0:
-                probe_face_idx = idx
-                probe_osm_id = osm_id
-                break
+            # Read raw STRING value for building (bytes in Blender 4.5)
+            raw_building = ""
+            if building_attr and building_attr.domain == "FACE" and building_attr.data_type == "STRING":
+                _raw_b = building_attr.data[probe_face_idx].value or b""
+                raw_building = _bytes_to_clean_str(_raw_b)
+                if raw_building == "__NULL__":
+                    raw_building = ""
 
-    if probe_face_idx is not None:
-        print(f"[M1DC P5 PROBE] mesh={mesh_name} probe_face={probe_face_idx} osm_id_int={probe_osm_id}")
-
-        # Read raw STRING value for building (bytes in Blender 4.5)
-        raw_building = ""
-        if building_attr and building_attr.domain == "FACE" and building_attr.data_type == "STRING":
-            _raw_b = building_attr.data[probe_face_idx].value or b""
-            raw_building = _bytes_to_clean_str(_raw_b)
-            if raw_building == "__NULL__":
-                raw_building = ""
-
-        print(f"\n[M1DC P5 ENCODE] mesh={mesh_name} face={probe_face_idx} feature_key=building")
-        print(f"  raw='{raw_building}'")
-
-        # Try to encode
-        cache_key = "building_code"
-        cache = _ENCODE_CACHE.get(cache_key, {})
-        probe_code = legend_encode(cache_key, raw_building)
-
-        print(f"  legend_key='{cache_key}' cache_size={len(cache)}")
-        print(f"  code={probe_code}")
-
-        if probe_code == 0 and raw_building and raw_building.strip():
-            # Raw is non-empty but code is 0 - why?
-            print(f"[M1DC P5 ENCODE MISS] raw not in cache!")
-            if raw_building in cache:
-                print(f"  BUT WAIT: exact match exists: '{raw_building}' -> {cache[raw_building]}")
-            else:
-                lower_val = raw_building.lower().strip()
-                found_similar = [(k, v) for k, v in list(cache.items())[:50] if k.lower() == lower_val]
-                if found_similar:
-                    print(f"  CASE MISMATCH: found similar: {found_similar}")
+            print(f"\n[M1DC P5 ENCODE] mesh={mesh_name} face={probe_face_idx} feature_key=building")
+            print(f"  raw='{raw_building}'")
+
+            # Try to encode
+            cache_key = "building_code"
+            cache = _ENCODE_CACHE.get(cache_key, {})
+            probe_code = legend_encode(cache_key, raw_building)
+
+            print(f"  legend_key='{cache_key}' cache_size={len(cache)}")
+            print(f"  code={probe_code}")
+
+            if probe_code == 0 and raw_building and raw_building.strip():
+                # Raw is non-empty but code is 0 - why?
+                print(f"[M1DC P5 ENCODE MISS] raw not in cache!")
+                if raw_building in cache:
+                    print(f"  BUT WAIT: exact match exists: '{raw_building}' -> {cache[raw_building]}")
                 else:
-                    sample_keys = list(cache.keys())[:10]
-                    print(f"  sample_keys={sample_keys}")
-
-        # BEFORE/AFTER writeback proof
-        if osm_building_code_attr:
-            before = osm_building_code_attr.data[probe_face_idx].value
-            osm_building_code_attr.data[probe_face_idx].value = probe_code
-            after = osm_building_code_attr.data[probe_face_idx].value
-
-            print(f"\n[M1DC P5 WRITE] mesh={mesh_name} face={probe_face_idx} target_attr=osm_building_code")
-            print(f"  before={before} code={probe_code} after={after}")
-
-            if after == 0 and probe_code > 0:
-                print(f"  ERROR: Writeback failed! code={probe_code} but after={after}")
-            elif after > 0:
-                print(f"  SUCCESS: Writeback confirmed (after > 0)")
+                    lower_val = raw_building.lower().strip()
+                    found_similar = [(k, v) for k, v in list(cache.items())[:50] if k.lower() == lower_val]
+                    if found_similar:
+                        print(f"  CASE MISMATCH: found similar: {found_similar}")
+                    else:
+                        sample_keys = list(cache.keys())[:10]
+                        print(f"  sample_keys={sample_keys}")
+
+            # BEFORE/AFTER writeback proof
+            if osm_building_code_attr:
+                before = osm_building_code_attr.data[probe_face_idx].value
+                osm_building_code_attr.data[probe_face_idx].value = probe_code
+                after = osm_building_code_attr.data[probe_face_idx].value
+
+                print(f"\n[M1DC P5 WRITE] mesh={mesh_name} face={probe_face_idx} target_attr=osm_building_code")
+                print(f"  before={before} code={probe_code} after={after}")
+
+                if after == 0 and probe_code > 0:
+                    print(f"  ERROR: Writeback failed! code={probe_code} but after={after}")
+                elif after > 0:
+                    print(f"  SUCCESS: Writeback confirmed (after > 0)")
+            else:
+                print(f"[M1DC P5 WRITE] osm_building_code attr not in code_attrs!")
         else:
-            print(f"[M1DC P5 WRITE] osm_building_code attr not in code_attrs!")
-    else:
-        print(f"[M1DC P5 PROBE] NO FACE WITH osm_id_int > 0 FOUND!")
-        if not osm_id_int_attr:
-            print(f"  osm_id_int attribute does not exist on mesh!")
-
-    # Also sample some STRING values to see what Phase 4 wrote
-    if building_attr and building_attr.domain == "FACE":
-        sample_vals = []
-        for poly in mesh.polygons[:20]:
-            val = building_attr.data[poly.index].value
-            sample_vals.append(repr(val))
-        print(f"\n[M1DC P5 SAMPLE] First 20 building STRING values: {sample_vals}")
-
-        # Count non-empty (bytes-safe)
-        nonempty_count = 0
-        for poly in mesh.polygons:
-            raw = building_attr.data[poly.index].value
-            cleaned = _bytes_to_clean_str(raw)
-            if cleaned != "__NULL__" and cleaned.strip():
-                nonempty_count += 1
-        print(f"[M1DC P5 SAMPLE] Total non-empty building: {nonempty_count}/{face_count}")
-    else:
-        print(f"[M1DC FORENSIC] building attribute not found or wrong type!")
-        nonempty_count = 0
+            print(f"[M1DC P5 PROBE] NO FACE WITH osm_id_int > 0 FOUND!")
+            if not osm_id_int_attr:
+                print(f"  osm_id_int attribute does not exist on mesh!")
+
+        # Also sample some STRING values to see what Phase 4 wrote
+        if building_attr and building_attr.domain == "FACE":
+            sample_vals = []
+            for poly in mesh.polygons[:20]:
+                val = building_attr.data[poly.index].value
+                sample_vals.append(repr(val))
+            print(f"\n[M1DC P5 SAMPLE] First 20 building STRING values: {sample_vals}")
+
+            # Count non-empty (bytes-safe)
+            nonempty_count = 0
+            for poly in mesh.polygons:
+                raw = building_attr.data[poly.index].value
+                cleaned = _bytes_to_clean_str(raw)
+                if cleaned != "__NULL__" and cleaned.strip():
+                    nonempty_count += 1
+            print(f"[M1DC P5 SAMPLE] Total non-empty building: {nonempty_count}/{face_count}")
+        else:
+            print(f"[M1DC FORENSIC] building attribute not found or wrong type!")
+            nonempty_count = 0
+
+    # Bulk-read + factorize every source STRING column once; the abort guard
+    # and the encode pass below both work on these (distinct values, inverse)
+    source_columns = {}
+    for key, string_name, code_name in attrs_to_encode:
+        src = mesh.attributes.get(string_name)
+        if src and src.domain == "FACE" and src.data_type == "STRING":
+            raw_values = _read_face_string_attr(src)[:face_count]
+            source_columns[key] = np.unique(np.array(raw_values, dtype=object), return_inverse=True)
 
     # ── P5 ABORT GUARD: If ALL STRING source attrs are empty, Phase 4 didn't write ──
     _p5_any_nonempty = False
-    for _p5_key, _p5_sname, _p5_cname in attrs_to_encode:
-        _p5_src = mesh.attributes.get(_p5_sname)
-        if _p5_src and _p5_src.domain == "FACE" and _p5_src.data_type == "STRING":
-            for _p5_poly in mesh.polygons:
-                _p5_raw = _p5_src.data[_p5_poly.index].value
-                _p5_val = _bytes_to_clean_str(_p5_raw)
-                if _p5_val != "__NULL__" and _p5_val.strip():
-                    _p5_any_nonempty = True
-                    break
+    for uniq_raw, _ in source_columns.values():
+        for raw in uniq_raw.tolist():
+            _p5_val = _bytes_to_clean_str(raw)
+            if _p5_val != "__NULL__" and _p5_val.strip():
+                _p5_any_nonempty = True
+                break
         if _p5_any_nonempty:
             break
     if not _p5_any_nonempty and face_count > 0:
@@ -3827,8 +4305,6 @@ def _materialize_legend_codes(mesh, gpkg_path, output_dir):
         return 0
 
     # Write codes to faces with detailed logging
-    total_codes_written = 0
-    nonzero_codes_written = 0
     # face_count already set at function top
 
     # Logging limits
@@ -3839,66 +4315,92 @@ def _materialize_legend_codes(mesh, gpkg_path, output_dir):
 
     # Stats per attribute
     attr_nonzero_counts = {key: 0 for key, _, _ in attrs_to_encode}
-    attr_unique_codes = {key: set() for key, _, _ in attrs_to_encode}
 
-    # [PHASE 12] Debug flag - only print detailed encoding for first mesh
-    DEBUG_ENCODING = (mesh.polygons and len(list(mesh.polygons)) > 0 and mesh.name)
+    # [PHASE 12] Debug flag - only print detailed encoding when P5 debugging is on
+    DEBUG_ENCODING = _P5_DEBUG
     debug_printed = False
 
-    for poly in mesh.polygons:
-        idx = poly.index
-        face_any_nonzero = False
+    # Writeback samples report the face's OSM id; resolve the source attr once
+    osm_id_sample_attr = None
+    if _P5_DEBUG:
+        for _id_name in ("osm_id", "osm_id_int"):
+            _id_attr = mesh.attributes.get(_id_name)
+            if _id_attr and _id_attr.domain == "FACE":
+                osm_id_sample_attr = _id_attr
+                break
 
-        for key, string_name, code_name in attrs_to_encode:
-            string_attr = mesh.attributes.get(string_name)
-            if string_attr is None:
+    # Bulk I/O: one read per source STRING column, one foreach_set per code column
+    code_arrays = {}
+    for key, string_name, code_name, feature_key, cache_key in encode_plan:
+        if key not in source_columns:
+            continue
+        uniq_raw, face_uidx = source_columns[key]
+        # Loop-invariant per attribute: bind the legend dict lookups once
+        cache_get = _ENCODE_CACHE.get(cache_key, {}).get
+        bytes_get = (_bytes_index(cache_key) or {}).get
+        codes_np = np.zeros(face_count, dtype=np.int32)
+
+        # Faces repeat a handful of values: decode + encode once per distinct
+        # raw value, then gather codes back with one index op
+        uniq_list = uniq_raw.tolist()
+        values_by_uidx = []
+        codes_by_uidx = []
+        for raw in uniq_list:
+            # Raw bytes that are a legend key resolve without decoding; their
+            # display value is decoded lazily below, only if sampled
+            code = bytes_get(raw)
+            if code is not None:
+                values_by_uidx.append(None)
+                codes_by_uidx.append(code)
                 continue
-
-            string_value = string_attr.data[idx].value
             # ── P5 FIX: Blender 4.5 STRING attrs return bytes; decode to clean str ──
-            string_value = _bytes_to_clean_str(string_value)
+            string_value = _bytes_to_clean_str(raw)
             if string_value == "__NULL__":
                 string_value = ""  # legend_encode treats empty as code=0
             # [PHASE 12 FIX] Use normalized feature key for legend cache lookup
             # Legend cache is keyed by "{feature_key}_code" where feature_key is normalized
-            feature_key = code_attr_to_feature_key(code_name)
-            cache_key = f"{feature_key}_code"
-            code = legend_encode(cache_key, string_value)
-
-            # [PHASE 12] Debug first encode per mesh
-            if DEBUG_ENCODING and not debug_printed and idx < 5 and code > 0:
-                debug_printed = True
-                print(f"[PH5 ENCODE] face={idx} feature_key='{feature_key}' val='{string_value}' cache_key='{cache_key}' code={code}")
-
-            # Log legend resolution (HIT or MISS) - reduced verbosity
-            if code > 0:
-                if len(legend_hit_samples[key]) < MAX_SAMPLES:
-                    legend_hit_samples[key].append((idx, string_value, code))
-            elif string_value and string_value.strip():
-                if len(legend_miss_samples[key]) < MAX_SAMPLES:
-                    legend_miss_samples[key].append((idx, string_value))
-
-            # Write the code
-            code_attrs[key].data[idx].value = code
-            total_codes_written += 1
-
-            if code > 0:
-                nonzero_codes_written += 1
-                face_any_nonzero = True
-                attr_nonzero_counts[key] += 1
-                attr_unique_codes[key].add(code)
-
-                # Writeback sample log (minimal)
-                if len(writeback_samples) < 3:
-                    osm_id_attr_str = mesh.attributes.get("osm_id")
-                    osm_id_attr_int = mesh.attributes.get("osm_id_int")
-                    if osm_id_attr_str and osm_id_attr_str.domain == "FACE":
-                        osm_id_val = osm_id_attr_str.data[idx].value
-                    elif osm_id_attr_int and osm_id_attr_int.domain == "FACE":
-                        osm_id_val = osm_id_attr_int.data[idx].value
-                    else:
-                        osm_id_val = 0
-                    writeback_samples.append((idx, osm_id_val, code_name, code, string_value))
+            # (same lookup as legend_encode; the value is already decoded/cleaned)
+            stripped = string_value.strip()
+            values_by_uidx.append(string_value)
+            codes_by_uidx.append(cache_get(stripped, 0) if stripped else 0)
+        code_table = np.array(codes_by_uidx, dtype=np.int32)
+        codes_np[:len(face_uidx)] = code_table[face_uidx]
+
+        # Diagnostic samples from the final arrays (first MAX_SAMPLES faces each)
+        hit_idx = np.flatnonzero(codes_np)[:MAX_SAMPLES].tolist()
+        legend_hit_samples[key] = [
+            (i, values_by_uidx[face_uidx[i]] or _bytes_to_clean_str(uniq_list[face_uidx[i]]),
+             codes_by_uidx[face_uidx[i]])
+            for i in hit_idx
+        ]
+        miss_by_uidx = np.array(
+            [not c and bool(v.strip()) for v, c in zip(values_by_uidx, codes_by_uidx)], dtype=bool)
+        if miss_by_uidx.any():
+            miss_idx = np.flatnonzero(miss_by_uidx[face_uidx])[:MAX_SAMPLES].tolist()
+            legend_miss_samples[key] = [(i, values_by_uidx[face_uidx[i]]) for i in miss_idx]
+
+        # [PHASE 12] Debug first encode per mesh
+        if DEBUG_ENCODING and not debug_printed and hit_idx and hit_idx[0] < 5:
+            debug_printed = True
+            idx, string_value, code = legend_hit_samples[key][0]
+            print(f"[PH5 ENCODE] face={idx} feature_key='{feature_key}' val='{string_value}' cache_key='{cache_key}' code={code}")
+
+        # Writeback sample log (minimal)
+        if _P5_DEBUG:
+            for idx, string_value, code in legend_hit_samples[key][:3 - len(writeback_samples)]:
+                osm_id_val = osm_id_sample_attr.data[idx].value if osm_id_sample_attr else 0
+                writeback_samples.append((idx, osm_id_val, code_name, code, string_value))
+
+        # Flush the staged int32 column with one foreach_set; no per-face RNA writes
+        # remain (re-resolve: handles go stale once attributes are added)
+        code_attr = mesh.attributes.get(code_name) or code_attrs[key]
+        code_attr.data.foreach_set("value", codes_np)
+        code_arrays[key] = codes_np
+        attr_nonzero_counts[key] = int(np.count_nonzero(codes_np))
+
+    # Totals derive from the staged arrays: every face of every written column counts
+    total_codes_written = face_count * len(code_arrays)
+    nonzero_codes_written = sum(attr_nonzero_counts.values())
 
     # ========================================
     # CRITICAL: Flush mesh attribute writes (Phase 5 codes)
@@ -3919,54 +4421,40 @@ def _materialize_legend_codes(mesh, gpkg_path, output_dir):
     # Phase 5 Proof Counters
     # ========================================
 
-    # Count faces that have ANY nonzero code across all attrs
-    faces_with_any_nonzero = 0
-    faces_with_nonempty_building = 0
+    # Read every written code column back once and reduce them together
+    any_nonzero = np.zeros(face_count, dtype=bool)
     osm_building_code_nonzero = 0
+    for key, string_name, code_name in attrs_to_encode:
+        code_attr = mesh.attributes.get(code_name)
+        if code_attr is None:
+            continue
+        try:
+            written_nonzero = _read_face_int_array(code_attr, face_count) > 0
+        except (TypeError, RuntimeError):
+            continue
+        any_nonzero |= written_nonzero
+        if key == "building":
+            osm_building_code_nonzero = int(np.count_nonzero(written_nonzero))
+    faces_with_any_nonzero = int(np.count_nonzero(any_nonzero))
 
-    osm_building_code_attr = code_attrs.get("building")
+    # Specific building counter (bytes-safe)
+    faces_with_nonempty_building = 0
     building_str_attr = mesh.attributes.get("building")  # Phase 4 writes as "building" without osm_ prefix
+    if building_str_attr:
+        try:
+            faces_with_nonempty_building = _count_nonempty_str_values(
+                _read_face_string_attr(building_str_attr)[:face_count])
+        except Exception:
+            pass
 
-    for poly in mesh.polygons:
-        idx = poly.index
-        any_nonzero = False
-
-        # Check all code attrs for this face
-        for key in code_attrs:
-            try:
-                if code_attrs[key].data[idx].value > 0:
-                    any_nonzero = True
-                    break
-            except Exception:
-                pass
-
-        if any_nonzero:
-            faces_with_any_nonzero += 1
-
-        # Specific building counters (bytes-safe)
-        if building_str_attr:
-            try:
-                val = building_str_attr.data[idx].value
-                cleaned = _bytes_to_clean_str(val)
-                if cleaned != "__NULL__" and cleaned.strip():
-                    faces_with_nonempty_building += 1
-            except Exception:
-                pass
-
-        if osm_building_code_attr:
-            try:
-                if osm_building_code_attr.data[idx].value > 0:
-                    osm_building_code_nonzero += 1
-            except Exception:
-                pass
-
-    print(f"\n[M1DC Phase5 Summary] mesh={mesh_name}")
-    print(f"  faces_total={face_count}")
-    print(f"  total_codes_written={total_codes_written}")
-    print(f"  nonzero_codes_written={nonzero_codes_written}")
-    print(f"  faces_with_any_nonzero={faces_with_any_nonzero}")
-    print(f"  faces_with_nonempty_building={faces_with_nonempty_building}")
-    print(f"  osm_building_code_nonzero={osm_building_code_nonzero}/{face_count}")
+    if _P5_DEBUG:
+        print(f"\n[M1DC Phase5 Summary] mesh={mesh_name}")
+        print(f"  faces_total={face_count}")
+        print(f"  total_codes_written={total_codes_written}")
+        print(f"  nonzero_codes_written={nonzero_codes_written}")
+        print(f"  faces_with_any_nonzero={faces_with_any_nonzero}")
+        print(f"  faces_with_nonempty_building={faces_with_nonempty_building}")
+        print(f"  osm_building_code_nonzero={osm_building_code_nonzero}/{face_count}")
     
     # [PHASE 9] Proof: Face code materialization validation
     if osm_building_code_nonzero > 0:
@@ -3976,23 +4464,12 @@ def _materialize_legend_codes(mesh, gpkg_path, output_dir):
             print(f"[PROOF][CODES] WARNING: attr=building_code has 0 nonzero faces but {face_count} total_faces exist")
 
     # Required proof: nonzero counts for key code attrs (if they exist)
-    osm_landuse_code_nonzero = 0
-    osm_name_code_nonzero = 0
-    osm_landuse_code_attr = mesh.attributes.get("osm_landuse_code")
-    osm_name_code_attr = mesh.attributes.get("osm_name_code")
-    if osm_landuse_code_attr and osm_landuse_code_attr.domain == "FACE":
-        try:
-            osm_landuse_code_nonzero = sum(1 for poly in mesh.polygons if osm_landuse_code_attr.data[poly.index].value > 0)
-        except Exception:
-            osm_landuse_code_nonzero = 0
-    if osm_name_code_attr and osm_name_code_attr.domain == "FACE":
-        try:
-            osm_name_code_nonzero = sum(1 for poly in mesh.polygons if osm_name_code_attr.data[poly.index].value > 0)
-        except Exception:
-            osm_name_code_nonzero = 0
+    osm_landuse_code_nonzero = _count_nonzero_int_attr(mesh, "osm_landuse_code")
+    osm_name_code_nonzero = _count_nonzero_int_attr(mesh, "osm_name_code")
 
-    print(f"  osm_landuse_code_nonzero={osm_landuse_code_nonzero}/{face_count}")
-    print(f"  osm_name_code_nonzero={osm_name_code_nonzero}/{face_count}")
+    if _P5_DEBUG:
+        print(f"  osm_landuse_code_nonzero={osm_landuse_code_nonzero}/{face_count}")
+        print(f"  osm_name_code_nonzero={osm_name_code_nonzero}/{face_count}")
     
     # [PHASE 9] Additional proof: Verify at least one code attribute has nonzero values
     code_attrs_with_nonzero = []
@@ -4009,16 +4486,18 @@ def _materialize_legend_codes(mesh, gpkg_path, output_dir):
         for attr_name, count in code_attrs_with_nonzero:
             print(f"[PROOF][CODES] {attr_name}={count}/{face_count}")
 
-    # Per-attribute stats
-    print(f"  attrs_nonzero_summary:")
-    for key, string_name, code_name in attrs_to_encode:
-        nonzero = attr_nonzero_counts[key]
-        unique = len(attr_unique_codes[key])
-        print(f"    {code_name}: nonzero_faces={nonzero}, unique_codes={unique}")
-        # [PHASE 12] Show sample writeback for verification
-        if nonzero > 0 and len(legend_hit_samples[key]) > 0:
-            sample = legend_hit_samples[key][0]  # (face_idx, string_value, code)
-            print(f"      sample: face={sample[0]} val='{sample[1]}' -> code={sample[2]}")
+    if _P5_DEBUG:
+        # Per-attribute stats
+        print(f"  attrs_nonzero_summary:")
+        for key, string_name, code_name in attrs_to_encode:
+            nonzero = attr_nonzero_counts[key]
+            codes_np = code_arrays.get(key)
+            unique = int(np.unique(codes_np[codes_np != 0]).size) if codes_np is not None else 0
+            print(f"    {code_name}: nonzero_faces={nonzero}, unique_codes={unique}")
+            # [PHASE 12] Show sample writeback for verification
+            if nonzero > 0 and len(legend_hit_samples[key]) > 0:
+                sample = legend_hit_samples[key][0]  # (face_idx, string_value, code)
+                print(f"      sample: face={sample[0]} val='{sample[1]}' -> code={sample[2]}")
 
     # Legend resolution summary
     total_hits = 0
@@ -4028,7 +4507,7 @@ def _materialize_legend_codes(mesh, gpkg_path, output_dir):
         misses = len(legend_miss_samples[key])
         total_hits += hits
         total_misses += misses
-        if hits > 0 or misses > 0:
+        if _P5_DEBUG and (hits > 0 or misses > 0):
             print(f"  legend_resolution[{code_name}]: hits={hits}, misses={misses}")
     
     # [PHASE 9] Proof: Feature lookup validation
@@ -4081,6 +4560,9 @@ def _materialize_legend_codes(mesh, gpkg_path, output_dir):
             print(f"[LEGEND_EXPORT] path={export_path} rows_written={rows_written} size_bytes={size_bytes}")
             if size_bytes == 0:
                 raise RuntimeError(f"[LEGEND_EXPORT] CSV file written but is empty (0 bytes)")
+            export_name = export_path_obj.name
+            if export_name not in csv_names:
+                csv_names = sorted(csv_names + [export_name])
         else:
             raise RuntimeError(f"[LEGEND_EXPORT] CSV file not found after export: {export_path}")
     except Exception as ex:
@@ -4097,22 +4579,21 @@ def _materialize_legend_codes(mesh, gpkg_path, output_dir):
 
     # [PHASE 4] Acceptance signals for legend export
     try:
-        legends_path = PathlibPath(output_dir) / "legends"
-        legend_files = list(legends_path.glob("*.csv")) if legends_path.exists() else []
-        print(f"[ACCEPT] legend_files_count={len(legend_files)}")
-        for csv_file in sorted(legend_files)[:5]:
-            print(f"[ACCEPT] legend_file={csv_file.name}")
+        print(f"[ACCEPT] legend_files_count={len(csv_names)}")
+        for csv_name in csv_names[:5]:
+            print(f"[ACCEPT] legend_file={csv_name}")
     except Exception as ex:
         print(f"[ACCEPT] legend_check_failed={ex}")
 
     # [PHASE 9] Proof: Legend CSV export validation
     try:
         legends_dir = PathlibPath(output_dir) / "legends"
-        csv_files = list(legends_dir.glob("*.csv")) if legends_dir.exists() else []
+        csv_files = csv_names
         if csv_files:
             combined_csv = legends_dir / "legend_codes_combined.csv"
             if combined_csv.exists():
-                with open(combined_csv, 'r') as f:
+                # Buffered binary line count: no text decoding of the combined CSV
+                with open(combined_csv, 'rb', buffering=1 << 20) as f:
                     row_count = sum(1 for _ in f) - 1  # subtract header
                 print(f"[PROOF][LEGENDS] dir={legends_dir} file_count={len(csv_files)} combined_csv_rows={row_count}")
                 if row_count == 0:
@@ -4138,27 +4619,87 @@ def _materialize_legend_codes(mesh, gpkg_path, output_dir):
     return nonzero_codes_written
 
 
+# Spreadsheet feature rows: {(gpkg_path, table, id_col): (sig, columns, {osm_id: row | None})}
+# None marks ids known to be absent. One column selection is kept per table; a changed
+# _gpkg_change_sig (main file or -wal) or selection replaces the entry.
+_OSM_FEATURE_ROW_CACHE = {}
+
+
+def _feature_row_cache(gpkg_path, table, id_col, columns):
+    """Return the {osm_id: row} cache for this GPKG/table/column selection."""
+    sig = _gpkg_change_sig(gpkg_path)
+    columns = tuple(columns)
+    key = (str(gpkg_path), table, id_col)
+    entry = _OSM_FEATURE_ROW_CACHE.get(key)
+    if entry is None or entry[0] != sig or entry[1] != columns:
+        entry = (sig, columns, {})
+        _OSM_FEATURE_ROW_CACHE[key] = entry
+    return entry[2]
+
+
+def _attrs_to_json(attrs):
+    """Serialize a spreadsheet attrs dict; orjson when available, else stdlib json."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(attrs).decode("utf-8")
+        except Exception:
+            pass  # e.g. ints beyond 64 bit: stdlib json handles them
+    return json.dumps(attrs)
+
+
+def _feature_row_key(osm_id):
+    """Integer feature-row cache key for any osm_id form (123, "123", 123.0, "123.0"), else None."""
+    norm = _normalize_osm_id(osm_id)
+    try:
+        return int(norm) if norm else None
+    except ValueError:
+        return None
+
+
+def _prefetch_feature_columns(gpkg_path, table, id_col, columns, osm_ids):
+    """Fill the feature-row cache for many osm_ids with one batched fetch.
+    Returns the {osm_id_int: row | None} cache, or None if the selection is incomplete.
+    Ids are only recorded as absent (None) after a fetch that succeeded, so a failed
+    query is retried on the next call.
+    """
+    if not gpkg_path or not table or not id_col or not columns:
+        return None
+    rows = _feature_row_cache(gpkg_path, table, id_col, columns)
+    missing = set()
+    for x in osm_ids:
+        i = _feature_row_key(x)
+        if i is not None and i not in rows:
+            missing.add(i)
+    if missing:
+        fetched = _fetch_osm_features_by_id(gpkg_path, table, id_col, columns, missing)
+        if fetched is not None:
+            for i in missing:
+                rows[i] = fetched.get(i)
+    return rows
+
+
 def _query_feature_columns(gpkg_path, table, id_col, osm_id, columns):
     if not gpkg_path or not table or not id_col or osm_id in (None, "—", ""):
         return {c: "—" for c in columns}
+    if not columns:
+        return {}
+    key_id = _feature_row_key(osm_id)
+    if key_id is None:
+        return _query_feature_columns_direct(gpkg_path, table, id_col, osm_id, columns)
+    rows = _feature_row_cache(gpkg_path, table, id_col, columns)
+    if key_id not in rows:
+        _prefetch_feature_columns(gpkg_path, table, id_col, columns, (key_id,))
+    row = rows.get(key_id)
+    return dict(row) if row else {c: "—" for c in columns}
+
+
+def _query_feature_columns_direct(gpkg_path, table, id_col, osm_id, columns):
+    """Single-row lookup for ids that are not integers (bypasses the row cache)."""
     try:
-        # Use centralized readonly DB access
-        if open_db_readonly:
-            con = open_db_readonly(gpkg_path, log_open=False)
-        else:
-            uri = f"file:{Path(gpkg_path).as_posix()}?mode=ro"
-            con = sqlite3.connect(uri, uri=True)
-            con.execute("PRAGMA busy_timeout=5000;")
-            con.execute("PRAGMA query_only=ON;")
-        con.row_factory = sqlite3.Row
-        cur = con.cursor()
-        cols_sane = [f'"{_sanitize_identifier(c)}"' for c in columns]
-        cols_sql = ", ".join(cols_sane) if cols_sane else "*"
-        t = _sanitize_identifier(table)
-        c = _sanitize_identifier(id_col)
+        cols_sql, t, c = _feature_select_parts(table, id_col, tuple(columns))
         sql = f'SELECT {cols_sql} FROM "{t}" WHERE "{c}" = ? LIMIT 1;'
-        row = cur.execute(sql, (osm_id,)).fetchone()
-        con.close()
+        with _ro_conn(gpkg_path) as con:
+            row = con.execute(sql, (osm_id,)).fetchone()
         result = {}
         for idx, col in enumerate(columns):
             try:
@@ -4173,66 +4714,119 @@ def _query_feature_columns(gpkg_path, table, id_col, osm_id, columns):
         return {c: "—" for c in columns}
 
 
+@functools.lru_cache(maxsize=64)
+def _feature_select_parts(table, id_col, columns):
+    """Sanitized (select_cols_sql, table, id_col) for a feature column selection, built once."""
+    cols_sane = [f'"{_sanitize_identifier(c)}"' for c in columns]
+    cols_sql = ", ".join(cols_sane) if cols_sane else "*"
+    return cols_sql, _sanitize_identifier(table), _sanitize_identifier(id_col)
+
+
+# Above this many distinct ids, _fetch_osm_features_by_id / _fetch_fixed_features join
+# a TEMP id table (_bulk_select_by_ids) instead of issuing one IN (...) query per chunk
+_FEATURE_FETCH_JOIN_MIN_IDS = 10000
+
+
 def _fetch_osm_features_by_id(gpkg_path, table, id_col, columns, osm_ids, chunk_size=900):
-    """Batch fetch OSM feature columns for many osm_ids. Returns {id: {col: val}}."""
-    if not gpkg_path or not table or not id_col or not columns or not osm_ids:
+    """Batch fetch OSM feature columns for many osm_ids. Returns {id: {col: val}},
+    or None if the query failed (so callers can tell "not found" from "not read").
+
+    `osm_ids` may be any iterable of int-like values or an integer ndarray.
+    """
+    if not gpkg_path or not table or not id_col or not columns or osm_ids is None:
         return {}
     result = {}
     try:
-        # Use centralized readonly DB access
-        if open_db_readonly:
-            con = open_db_readonly(gpkg_path, log_open=False)
+        cols_sql, t_sane, id_sane = _feature_select_parts(table, id_col, tuple(columns))
+        select_cols = f'"{id_sane}", {cols_sql}'
+        if isinstance(osm_ids, np.ndarray) and osm_ids.dtype.kind in "iu":
+            ids_arr = osm_ids.astype(np.int64, copy=False).ravel()
         else:
-            uri = f"file:{Path(gpkg_path).as_posix()}?mode=ro"
-            con = sqlite3.connect(uri, uri=True)
-            con.execute("PRAGMA busy_timeout=5000;")
-            con.execute("PRAGMA query_only=ON;")
-        cur = con.cursor()
-        t_sane = _sanitize_identifier(table)
-        id_sane = _sanitize_identifier(id_col)
-        col_sane = [f'"{_sanitize_identifier(c)}"' for c in columns]
-        select_cols = ", ".join([f'"{id_sane}"'] + col_sane)
-        osm_ids_list = list({int(x) for x in osm_ids if x is not None})
-        for i in range(0, len(osm_ids_list), chunk_size):
-            batch = osm_ids_list[i:i + chunk_size]
-            placeholders = ",".join(["?"] * len(batch))
-            sql = f'SELECT {select_cols} FROM "{t_sane}" WHERE "{id_sane}" IN ({placeholders});'
-            rows = cur.execute(sql, batch).fetchall()
-            for row in rows:
-                try:
-                    osm_id_val = int(row[0]) if row and row[0] is not None else None
-                except Exception:
-                    osm_id_val = None
-                if osm_id_val is None:
-                    continue
-                feature_row = {}
-                for idx, col in enumerate(columns, start=1):
-                    val = row[idx] if idx < len(row) else None
-                    feature_row[col] = "—" if val in (None, "") else val
-                result[osm_id_val] = feature_row
-        try:
-            con.close()
-        except Exception:
-            pass
+            ids_arr = np.fromiter((int(x) for x in osm_ids if x is not None), dtype=np.int64)
+        uniq = np.unique(ids_arr)
+        if not uniq.size:
+            return {}
+        # Pooled read-only handle; full chunks share one SQL text, so sqlite3's
+        # statement cache reuses the prepared statement across chunks and calls.
+        # The ExitStack closes a bulk join (dropping temp._ids) before the handle is pooled.
+        with _ro_conn(gpkg_path) as con, ExitStack() as stack:
+            cur = con.cursor()
+            if uniq.size >= _FEATURE_FETCH_JOIN_MIN_IDS:
+                join_cols = (id_sane,) + tuple(_sanitize_identifier(c) for c in columns)
+                batches = (stack.enter_context(
+                    closing(_bulk_select_by_ids(cur, t_sane, id_sane, uniq.tolist(), join_cols))
+                ),)
+            else:
+                batches = (
+                    cur.execute(
+                        f'SELECT {select_cols} FROM "{t_sane}" WHERE "{id_sane}" IN '
+                        f'({",".join(["?"] * len(batch))});',
+                        batch,
+                    ).fetchall()
+                    for batch in (uniq[i:i + chunk_size].tolist() for i in range(0, uniq.size, chunk_size))
+                )
+            for rows in batches:
+                for row in rows:
+                    try:
+                        osm_id_val = int(row[0]) if row and row[0] is not None else None
+                    except Exception:
+                        osm_id_val = None
+                    if osm_id_val is None:
+                        continue
+                    feature_row = {}
+                    for idx, col in enumerate(columns, start=1):
+                        val = row[idx] if idx < len(row) else None
+                        feature_row[col] = "—" if val in (None, "") else val
+                    result[osm_id_val] = feature_row
     except Exception as ex:
         log_warn(f"[Materialize] Feature fetch failed: {ex}")
+        return None
     return result
 
 
+# Declared-affinity probe: {(gpkg_path, table, id_col): (sig, int | str | None)}
+_ID_COL_BIND_CACHE = {}
+
+# Normalized ids that can be bound as ints against an INTEGER id column
+_INT_ID_MATCH = re.compile(r"-?[0-9]+").fullmatch
+
+
+def _id_col_bind_type(con, gpkg_path, table, id_col):
+    """How to bind ids against `id_col`: int (INTEGER affinity), str (TEXT) or None.
+
+    None means the declared type is missing or REAL/NUMERIC/BLOB, where only
+    CAST(id_col AS TEXT) matches string-normalized ids reliably.
+    """
+    # schema_version comes from `con` itself, so it also sees ALTERs still in the -wal
+    sig = (_gpkg_change_sig(gpkg_path), con.execute("PRAGMA schema_version").fetchone()[0])
+    key = (str(gpkg_path), table, id_col)
+    cached = _ID_COL_BIND_CACHE.get(key)
+    if cached is not None and cached[0] == sig:
+        return cached[1]
+    bind = None
+    for row in con.execute(f'PRAGMA table_info("{_sanitize_identifier(table)}")'):
+        if row[1] == id_col:
+            decl = str(row[2] or "").upper()
+            if "INT" in decl:
+                bind = int
+            elif "CHAR" in decl or "CLOB" in decl or "TEXT" in decl:
+                bind = str
+            break
+    _ID_COL_BIND_CACHE[key] = (sig, bind)
+    return bind
+
+
 def _fetch_fixed_features(gpkg_path, table, id_col, columns, osm_ids, chunk_size=900):
     """Fetch fixed feature columns for many ids -> returns mapping and vocab per column.
 
     Type-tolerant:
     - Works when id_col is TEXT (osm_way_id) or numeric (osm_id)
-    - Normalizes all ids to strings and queries via CAST(id_col AS TEXT)
+    - Normalizes all ids to strings; INTEGER/TEXT id columns are compared directly
+      (ints/strings bound), anything else via CAST(id_col AS TEXT)
     """
-    try:
-        from .utils.common import resolve_gpkg_path, log_gpkg_resolution
-        resolved, info = resolve_gpkg_path(gpkg_path)
-        log_gpkg_resolution(gpkg_path, resolved, info, prefix="[Materialize][GPKG]")
-        gpkg_path = resolved or gpkg_path
-    except Exception:
-        pass
+    # No columns selected -> nothing to query; duplicates are selected once
+    columns = list(dict.fromkeys(columns or ()))
+    gpkg_path = _resolved_gpkg(gpkg_path, log_prefix="[Materialize][GPKG]")
     if not gpkg_path or not table or not id_col or not columns or not osm_ids:
         return {}, {col: {"vocab": {"": 0}, "inv": [""]} for col in columns}
 
@@ -4240,49 +4834,73 @@ def _fetch_fixed_features(gpkg_path, table, id_col, columns, osm_ids, chunk_size
     vocab = {col: {"": 0} for col in columns}
     inv_vocab = {col: [""] for col in columns}
     rows_total = 0
-    sample_row = None
+    # One normalization pass per id. Sorted on purpose: set order of str ids varies
+    # with hash seed, which would reshuffle chunks and thus the vocab code order
+    osm_ids_list = sorted({i for i in map(_normalize_osm_id, osm_ids) if i})
 
     try:
-        if open_db_readonly:
-            con = open_db_readonly(gpkg_path, log_open=False)
-        else:
-            uri = f"file:{Path(gpkg_path).as_posix()}?mode=ro"
-            con = sqlite3.connect(uri, uri=True)
-        cur = con.cursor()
-        t_sane = _sanitize_identifier(table)
-        id_sane = _sanitize_identifier(id_col)
-        col_sane = [f'"{_sanitize_identifier(c)}"' for c in columns]
-        select_cols = ", ".join([f'"{id_sane}"'] + col_sane)
-        osm_ids_list = sorted({_normalize_osm_id(x) for x in osm_ids if _normalize_osm_id(x)})
+        cols_sql, t_sane, id_sane = _feature_select_parts(table, id_col, tuple(columns))
+        select_cols = f'"{id_sane}", {cols_sql}'
         log_info(f"[Materialize] Feature fetch: querying {len(osm_ids_list)} ids from {table} on {id_col}")
-        for i in range(0, len(osm_ids_list), chunk_size):
-            batch = osm_ids_list[i:i + chunk_size]
-            placeholders = ",".join(["?"] * len(batch))
-            sql = f'SELECT {select_cols} FROM "{t_sane}" WHERE CAST("{id_sane}" AS TEXT) IN ({placeholders});'
-            rows = cur.execute(sql, list(batch)).fetchall()
-            rows_total += len(rows)
-            if sample_row is None and rows:
-                sample_row = rows[0]
-            for row in rows:
-                osm_val = _normalize_osm_id(row[0]) if row else ""
-                if not osm_val:
-                    continue
-                mapping.setdefault(osm_val, {})
-                for idx, col in enumerate(columns, start=1):
-                    val = row[idx] if idx < len(row) else ""
-                    if val in (None, ""):
-                        val = ""
-                    val = str(val)
-                    mapping[osm_val][col] = val
-                    voc = vocab[col]
-                    if val not in voc:
-                        code = len(inv_vocab[col])
-                        voc[val] = code
-                        inv_vocab[col].append(val)
-        try:
-            con.close()
-        except Exception:
-            pass
+        col_voc_inv = [(col, vocab[col], inv_vocab[col]) for col in columns]
+        # The ExitStack closes a bulk join (dropping temp._ids) before the handle is pooled
+        with _ro_conn(gpkg_path) as con, ExitStack() as stack:
+            # Compare id_col directly (index-usable) when its affinity is known;
+            # CAST(... AS TEXT) only for untyped/other columns
+            bind = _id_col_bind_type(con, gpkg_path, table, id_col)
+            if bind is None:
+                id_expr = f'CAST("{id_sane}" AS TEXT)'
+                ids = osm_ids_list
+            else:
+                id_expr = f'"{id_sane}"'
+                # Non-integer ids ("123.5", "way/1") cannot match an INTEGER column:
+                # skip them rather than let int() abort the whole fetch
+                ids = [int(x) for x in osm_ids_list if _INT_ID_MATCH(x)] if bind is int else osm_ids_list
+            # Every full chunk reuses one SQL text (so sqlite3's statement cache keeps it
+            # prepared); only the trailing short chunk needs a second statement
+            sql_head = f'SELECT {select_cols} FROM "{t_sane}" WHERE {id_expr} IN ('
+            sql_full = sql_head + ",".join(["?"] * chunk_size) + ");"
+            # Plain tuples, streamed straight off the cursor (no per-chunk row list)
+            cur = con.cursor()
+            cur.row_factory = None
+            cur.arraysize = 256
+            if len(ids) >= _FEATURE_FETCH_JOIN_MIN_IDS:
+                # Large id sets: one TEMP-table join instead of an IN query per chunk
+                join_cols = (id_sane,) + tuple(_sanitize_identifier(c) for c in columns)
+                batches = (stack.enter_context(
+                    closing(_bulk_select_by_ids(cur, t_sane, id_sane, ids, join_cols, cast_id_text=bind is None))
+                ),)
+            else:
+                batches = (
+                    cur.execute(
+                        sql_full if len(batch) == chunk_size else sql_head + ",".join(["?"] * len(batch)) + ");",
+                        batch,
+                    )
+                    for batch in (ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size))
+                )
+            for rows in batches:
+                for row in rows:
+                    rows_total += 1
+                    osm_val = _normalize_osm_id(row[0])
+                    if not osm_val:
+                        continue
+                    feat = mapping.get(osm_val)
+                    if feat is None:
+                        feat = mapping[osm_val] = {}
+                    # The SELECT fixes the arity: row[1:] lines up with col_voc_inv
+                    for (col, voc, inv), val in zip(col_voc_inv, row[1:]):
+                        if val is None:
+                            val = ""
+                        elif val.__class__ is not str:
+                            val = str(val)
+                        # The vocab doubles as the intern table: repeated values share
+                        # the str object stored in inv instead of one copy per row
+                        code = voc.setdefault(val, len(inv))
+                        if code == len(inv):
+                            inv.append(val)
+                        else:
+                            val = inv[code]
+                        feat[col] = val
     except Exception as ex:
         log_warn(f"[Materialize] Fixed feature fetch failed: {ex}")
     if rows_total == 0:
@@ -4290,43 +4908,78 @@ def _fetch_fixed_features(gpkg_path, table, id_col, columns, osm_ids, chunk_size
             f"[Materialize] Feature fetch returned 0 rows for {len(osm_ids_list)} ids (check id_col type/text mismatch: {id_col})"
         )
     else:
-        log_info(f"[Materialize] Feature fetch rows={rows_total}; sample={sample_row}")
+        # Sample taken from the result instead of tracking a first row inside the loop
+        log_info(f"[Materialize] Feature fetch rows={rows_total}; sample={next(iter(mapping.items()), None)}")
     # package vocab
     vocab_info = {col: {"vocab": vocab[col], "inv": inv_vocab[col]} for col in columns}
     return mapping, vocab_info
 
 
-def _fetch_name_for_osm_id(gpkg_path, table, osm_id):
-    """Fetch single 'name' for an osm_id (CAST to INT) to avoid city-scale string attributes."""
+@functools.lru_cache(maxsize=32)
+def _names_by_osm_id_sql(table, n):
+    """Name lookup SQL for `n` osm_ids in `table` (identical text -> reused prepared statement)."""
+    t_sane = _sanitize_identifier(table)
+    return (
+        f'SELECT CAST("osm_id" AS INTEGER), "name" FROM "{t_sane}" '
+        f'WHERE CAST("osm_id" AS INTEGER) IN ({",".join(["?"] * n)});'
+    )
+
+
+def _fetch_names_for_osm_ids(gpkg_path, table, osm_ids, chunk_size=900):
+    """Fetch 'name' for many osm_ids (CAST to INT) with chunked IN queries.
+
+    Returns {osm_id_int: name}; ids without a row are absent. The first row wins
+    on duplicate osm_ids, like the former single-id LIMIT 1 lookup.
+    """
+    gpkg_path = _resolved_gpkg(gpkg_path)
+    if not gpkg_path or not table or not osm_ids:
+        return {}
+    names = {}
     try:
-        from .utils.common import resolve_gpkg_path
-        resolved, _ = resolve_gpkg_path(gpkg_path)
-        gpkg_path = resolved or gpkg_path
-    except Exception:
-        pass
-    if not gpkg_path or not table or not osm_id:
+        ids = sorted({int(x) for x in osm_ids if x})
+        with _ro_conn(gpkg_path) as con:
+            cur = con.cursor()
+            cur.row_factory = None
+            cur.arraysize = 256
+            for i in range(0, len(ids), chunk_size):
+                batch = ids[i:i + chunk_size]
+                for osm_id_val, val in cur.execute(_names_by_osm_id_sql(table, len(batch)), batch):
+                    if osm_id_val not in names:
+                        names[osm_id_val] = "" if val in (None, "") else str(val)
+    except Exception as ex:
+        log_warn(f"[Inspector] Name fetch failed for {len(osm_ids)} osm_ids: {ex}")
+    return names
+
+
+def _fetch_name_for_osm_id(gpkg_path, table, osm_id):
+    """Fetch single 'name' for an osm_id (CAST to INT) to avoid city-scale string attributes.
+    Thin wrapper over _fetch_names_for_osm_ids; prefer the batched call for many ids.
+    """
+    if not osm_id:
         return ""
     try:
-        if open_db_readonly:
-            con = open_db_readonly(gpkg_path, log_open=False)
-        else:
-            uri = f"file:{Path(gpkg_path).as_posix()}?mode=ro"
-            con = sqlite3.connect(uri, uri=True)
-        cur = con.cursor()
-        t_sane = _sanitize_identifier(table)
-        row = cur.execute(
-            f'SELECT "name" FROM "{t_sane}" WHERE CAST("osm_id" AS INTEGER)=? LIMIT 1;', (int(osm_id),)
-        ).fetchone()
-        try:
-            con.close()
-        except Exception:
-            pass
-        if row and len(row):
-            val = row[0]
-            return "" if val in (None, "") else str(val)
-    except Exception as ex:
+        key = int(osm_id)
+    except (TypeError, ValueError) as ex:
         log_warn(f"[Inspector] Name fetch failed for osm_id={osm_id}: {ex}")
-    return ""
+        return ""
+    return _fetch_names_for_osm_ids(gpkg_path, table, [key]).get(key, "")
+
+
+# building_idx sets per source_tile for the last link map seen: (link_map, {tile: {bidx}})
+_LINK_TILE_INDEX = None
+
+
+def _linked_bidx_for_tile(link_map, source_tile):
+    """Set of building_idx linked on `source_tile`; the index is rebuilt only when
+    _load_link_lookup hands out a different (reloaded) map object.
+    """
+    global _LINK_TILE_INDEX
+    if _LINK_TILE_INDEX is None or _LINK_TILE_INDEX[0] is not link_map:
+        by_tile = defaultdict(set)
+        for tile, bidx in link_map:
+            by_tile[tile].add(bidx)
+        _LINK_TILE_INDEX = (link_map, dict(by_tile))
+    return _LINK_TILE_INDEX[1].get(source_tile, ())
 
 
 def _build_spreadsheet_rows(context, s):
@@ -4346,33 +4999,57 @@ def _build_spreadsheet_rows(context, s):
     try:
         s.spreadsheet_rows.clear()
         max_rows = getattr(s, "spreadsheet_max_rows", 5000)
-        row_count = 0
-        for bidx in building_indices:
-            if row_count >= max_rows:
-                s.spreadsheet_last_error = f"Showing {max_rows}/{len(building_indices)} buildings — refine selection or filter"
-                break
-            
-            key = (source_tile, int(bidx))
-            map_entry = link_map.get(key, {}) if link_map else {}
-            osm_id = map_entry.get("osm_id", "—") or "—"
-            link_conf = float(map_entry.get("link_conf", 0.0) or 0.0)
-            
-            # Extract centroids from link map (proof-of-linking)
-            citygml_cent = map_entry.get("citygml_centroid", "—") or "—"
-            osm_cent = map_entry.get("osm_centroid", "—") or "—"
-            
-            attrs = _query_feature_columns(s.gpkg_path, table, id_col, osm_id if osm_id != "—" else None, columns)
+        # Resolve link entries, display values and attrs JSON for the shown rows up
+        # front; the loop at the end only fills the Blender collection items
+        bidx_list = [int(b) for b in building_indices[:max_rows]]
+        empty = {}
+        tile_bidx = _linked_bidx_for_tile(link_map, source_tile) if link_map else None
+        if tile_bidx:
+            entries = [link_map[(source_tile, b)] or empty if b in tile_bidx else empty for b in bidx_list]
+        else:
+            # Nothing linked on this tile: skip the per-building key lookups entirely
+            entries = [empty] * len(bidx_list)
+        osm_ids = [e.get("osm_id") or "—" for e in entries]
+        link_confs = [float(e.get("link_conf") or 0.0) for e in entries]
+        # Centroids from link map (proof-of-linking)
+        citygml_cents = [str(e.get("citygml_centroid") or "—") for e in entries]
+        osm_cents = [str(e.get("osm_centroid") or "—") for e in entries]
+
+        # One batched fetch for every linked row shown, instead of a query per row;
+        # rows sharing an osm_id share one json.dumps
+        feature_rows = None
+        if link_map and columns:
+            feature_rows = _prefetch_feature_columns(s.gpkg_path, table, id_col, columns, osm_ids)
+        missing_attrs = {c: "—" for c in columns}
+        json_by_key = {}
+        attrs_json_list = []
+        for osm_id in osm_ids:
+            row_key = _feature_row_key(osm_id)
+            if feature_rows is not None and row_key is not None:
+                attrs_json = json_by_key.get(row_key)
+                if attrs_json is None:
+                    attrs_json = json_by_key[row_key] = _attrs_to_json(feature_rows.get(row_key) or missing_attrs)
+            else:
+                attrs_json = _attrs_to_json(
+                    _query_feature_columns(s.gpkg_path, table, id_col, osm_id if osm_id != "—" else None, columns)
+                )
+            attrs_json_list.append(attrs_json)
 
-            item = s.spreadsheet_rows.add()
+        rows = s.spreadsheet_rows
+        for bidx, osm_id, link_conf, citygml_cent, osm_cent, attrs_json in zip(
+            bidx_list, osm_ids, link_confs, citygml_cents, osm_cents, attrs_json_list
+        ):
+            item = rows.add()
             item.source_tile = source_tile
-            item.building_idx = int(bidx)
-            item.citygml_centroid = str(citygml_cent)
+            item.building_idx = bidx
+            item.citygml_centroid = citygml_cent
             item.link_conf = link_conf
-            item.osm_centroid = str(osm_cent)
+            item.osm_centroid = osm_cent
             item.osm_id = str(osm_id)
-            item.attrs_json = json.dumps(attrs)
+            item.attrs_json = attrs_json
             item.selected = False
-            row_count += 1
+        if len(building_indices) > max_rows:
+            s.spreadsheet_last_error = f"Showing {max_rows}/{len(building_indices)} buildings — refine selection or filter"
         
         s.spreadsheet_row_index = 0 if len(s.spreadsheet_rows) else -1
         s.spreadsheet_cached_obj = obj.name
@@ -4460,23 +5137,27 @@ def _select_faces_by_building_idx(context, obj, building_idx):
     if b_attr is None or b_attr.domain != "FACE":
         return False
 
+    # Match building_idx for every face in one foreach_get instead of an RNA
+    # lookup per face (sync first: in Edit Mode the BMesh owns the data)
+    _sync_edit_mesh(obj)
+    b_attr = mesh.attributes.get("building_idx")
+    face_count = len(mesh.polygons)
+    try:
+        mask = _read_face_int_array(b_attr, face_count) == building_idx
+        mask[len(b_attr.data):] = False  # zero padding is not a building_idx
+        selected = mask.tolist()
+    except Exception:
+        selected = [False] * face_count
+
     # Ensure edit mode
     if obj.mode != 'EDIT':
         bpy.ops.object.mode_set(mode='EDIT')
 
     bm = bmesh.from_edit_mesh(mesh)
-    try:
-        for f in bm.faces:
-            idx = f.index
-            val = None
-            try:
-                val = int(b_attr.data[idx].value)
-            except Exception:
-                val = None
-            f.select = bool(val == building_idx)
-        bmesh.update_edit_mesh(mesh, loop_triangles=False, destructive=False)
-    finally:
-        pass
+    selected += [False] * (len(bm.faces) - len(selected))
+    for f, on in zip(bm.faces, selected):
+        f.select = on
+    bmesh.update_edit_mesh(mesh, loop_triangles=False, destructive=False)
     return True
 
 
@@ -4553,7 +5234,6 @@ def _do_validation(context, s):
     raw_gpkg = getattr(s, "gpkg_path", "")
     resolved_gpkg = ""
     try:
-        from .utils.common import resolve_gpkg_path, log_gpkg_resolution
         resolved_gpkg, info = resolve_gpkg_path(raw_gpkg)
         log_gpkg_resolution(raw_gpkg, resolved_gpkg, info, prefix="[Validate][GPKG]")
     except Exception:
@@ -4625,38 +5305,40 @@ def infer_world_origin_from_citygml_tiles(s, citygml_dir: str) -> bool:
         log_warn(f"[CityGML] No CityGML files found in {citygml_dir}; cannot infer origin.")
         return False
     
-    tile_coords = []
+    # Single pass: E/N tokens straight into preallocated arrays, km tokens into a list
+    ev = np.empty(len(tile_files), dtype=np.int64)
+    nv = np.empty(len(tile_files), dtype=np.int64)
+    km_values = []
+    n_tiles = 0
     for file_path in tile_files:
         coords = parse_citygml_tile_coords(file_path.name)
         if coords:
-            e_raw, n_raw, km_val = coords
-            tile_coords.append((e_raw, n_raw, km_val))
+            ev[n_tiles], nv[n_tiles], km_val = coords
+            if km_val is not None:
+                km_values.append(km_val)
+            n_tiles += 1
     
-    if not tile_coords:
+    if not n_tiles:
         log_warn(f"[CityGML] No recognizable tile coordinate patterns in {citygml_dir}; cannot infer origin.")
         return False
-    
-    # Extract E and N values separately
-    e_values = [e for e, n, km in tile_coords]
-    n_values = [n for e, n, km in tile_coords]
-    km_values = [km for e, n, km in tile_coords if km is not None]
+    ev = ev[:n_tiles]
+    nv = nv[:n_tiles]
     
     # Infer tile spacing (most common step between sorted unique values)
     def most_common_positive_step(values):
-        vals = sorted(set(values))
-        diffs = [b - a for a, b in zip(vals, vals[1:]) if (b - a) > 0]
-        if not diffs:
+        diffs = np.diff(np.unique(np.asarray(values, dtype=np.int64)))
+        if diffs.size == 0:
             return None
-        counts = {}
-        for d in diffs:
-            counts[d] = counts.get(d, 0) + 1
-        return max(counts.items(), key=lambda kv: kv[1])[0]
+        steps, first, counts = np.unique(diffs, return_index=True, return_counts=True)
+        # Ties go to the step seen first along the sorted values
+        tied = np.flatnonzero(counts == counts.max())
+        return int(steps[tied[np.argmin(first[tied])]])
     
-    delta_raw_e = most_common_positive_step(e_values)
-    delta_raw_n = most_common_positive_step(n_values)
+    delta_raw_e = most_common_positive_step(ev)
+    delta_raw_n = most_common_positive_step(nv)
     
     if not delta_raw_e or not delta_raw_n:
-        log_warn(f"[CityGML] Could not infer tile spacing from {len(tile_coords)} tiles; origin inference failed.")
+        log_warn(f"[CityGML] Could not infer tile spacing from {n_tiles} tiles; origin inference failed.")
         return False
     
     # Determine tile size from filenames (3rd numeric token).
@@ -4665,7 +5347,6 @@ def infer_world_origin_from_citygml_tiles(s, citygml_dir: str) -> bool:
     #   LoD2_32_290000_5626000_2000_NW -> tile_size_raw=2000 (m) -> tile_size_m=2000
     if km_values:
         # Use the most common tile size token across filenames.
-        from collections import Counter
         tile_size_raw = Counter(km_values).most_common(1)[0][0]
     else:
         tile_size_raw = 1000
@@ -4685,34 +5366,17 @@ def infer_world_origin_from_citygml_tiles(s, citygml_dir: str) -> bool:
     #   - 290     (km)  -> 290000 m
     #   - 32290   (zone 32 + km 290) -> 290000 m
     # We normalize both cases here.
-    def _e_raw_to_m(e_raw: int) -> float:
-        # If the e_raw looks like "32xxx", strip zone prefix by modulo 1000.
-        if 10_000 <= e_raw < 100_000:
-            e_km = e_raw % 1000
-            return float(e_km * 1000)
-        # If it's a small value, interpret as km.
-        if e_raw < 10_000:
-            return float(e_raw * 1000)
-        # Otherwise assume it's already meters.
-        return float(e_raw)
-
-    def _n_raw_to_m(n_raw: int) -> float:
-        if n_raw < 10_000:
-            return float(n_raw * 1000)
-        if n_raw < 1_000_000:
-            # some datasets store northing in meters already but still < 1e6 is unlikely for EPSG:25832
-            return float(n_raw * 1000)
-        return float(n_raw)
-
-    e_values_m = [_e_raw_to_m(e) for e in e_values]
-    n_values_m = [_n_raw_to_m(n) for n in n_values]
+    # E: small values are km; "32xxx" strips the zone prefix by modulo 1000; else meters.
+    e_values_m = np.where(ev < 10_000, ev * 1000, np.where(ev < 100_000, (ev % 1000) * 1000, ev)).astype(np.float64)
+    # N: below 1e6 is km (meters < 1e6 is unlikely for EPSG:25832); else meters.
+    n_values_m = np.where(nv < 1_000_000, nv * 1000, nv).astype(np.float64)
     tile_size_m = float(tile_size_raw * 1000) if tile_size_raw < 1000 else float(tile_size_raw)
 
     # Compute world bounds from tile grid (expand by one tile edge)
-    min_e_inferred = min(e_values_m)
-    max_e_inferred = max(e_values_m) + tile_size_m
-    min_n_inferred = min(n_values_m)
-    max_n_inferred = max(n_values_m) + tile_size_m
+    min_e_inferred = float(e_values_m.min())
+    max_e_inferred = float(e_values_m.max()) + tile_size_m
+    min_n_inferred = float(n_values_m.min())
+    max_n_inferred = float(n_values_m.max()) + tile_size_m
 
     # Plausibility gate for EPSG:25832 meters (Cologne-ish)
     if not (100_000 <= min_e_inferred <= 1_000_000 and 1_000_000 <= min_n_inferred <= 10_000_000):
@@ -4734,7 +5398,7 @@ def infer_world_origin_from_citygml_tiles(s, citygml_dir: str) -> bool:
             log_info(
                 f"[CityGML] WORLD_ORIGIN inferred from tile grid: "
                 f"min=({min_e_inferred:.0f},{min_n_inferred:.0f}) max=({max_e_inferred:.0f},{max_n_inferred:.0f}) "
-                f"from {len(tile_coords)} tiles (e_mult={mult_e}, n_mult={mult_n})"
+                f"from {n_tiles} tiles (e_mult={mult_e}, n_mult={mult_n})"
             )
             try:
                 if inferred_origin.get("tile_size_m") in (None, 0, 0.0, ""):
@@ -4757,10 +5421,27 @@ def infer_world_origin_from_citygml_tiles(s, citygml_dir: str) -> bool:
         return False
 
 
+def _world_bbox(obj):
+    """World-space XY bounds of obj.bound_box -> (min_xy, max_xy, center_xy, size_xy).
+
+    All 8 corners go through matrix_world in one numpy matmul; min/max are rounded
+    to 3 decimals, as the diagnostics have always reported them.
+    """
+    corners = np.asarray(obj.bound_box, dtype=np.float64)  # (8, 3)
+    mw = np.asarray(obj.matrix_world, dtype=np.float64)  # (4, 4), rows
+    xy = corners @ mw[:2, :3].T + mw[:2, 3]
+    lo = xy.min(axis=0)
+    hi = xy.max(axis=0)
+    min_xy = (round(float(lo[0]), 3), round(float(lo[1]), 3))
+    max_xy = (round(float(hi[0]), 3), round(float(hi[1]), 3))
+    size_xy = (max_xy[0] - min_xy[0], max_xy[1] - min_xy[1])
+    center_xy = ((min_xy[0] + max_xy[0]) / 2, (min_xy[1] + max_xy[1]) / 2)
+    return min_xy, max_xy, center_xy, size_xy
+
+
 def _run_citygml_import(s):
     # === CITYGML FORENSICS LOG ===
     try:
-        import mathutils
         world_origin = bpy.data.objects.get('M1DC_WORLD_ORIGIN')
         wo_log = '[CITYGML_FORENSICS]\n'
         if world_origin:
@@ -4775,22 +5456,14 @@ def _run_citygml_import(s):
             citygml_objs = [o for o in citygml_col.objects if o.type == 'MESH']
         wo_log += f"B) CITYGML_TILES meshes: {len(citygml_objs)}\n"
         for i, o in enumerate(citygml_objs[:5]):
-            bbox = [o.matrix_world @ mathutils.Vector(corner) for corner in o.bound_box]
-            minx = round(min(v.x for v in bbox), 3)
-            miny = round(min(v.y for v in bbox), 3)
-            maxx = round(max(v.x for v in bbox), 3)
-            maxy = round(max(v.y for v in bbox), 3)
+            bbox_min, bbox_max = _world_bbox(o)[:2]
             loc = tuple(round(c, 3) for c in o.location)
-            wo_log += f"  tile[{i}] {o.name}: loc={loc} bbox_xy=(({minx}, {miny}), ({maxx}, {maxy}))\n"
+            wo_log += f"  tile[{i}] {o.name}: loc={loc} bbox_xy=({bbox_min}, {bbox_max})\n"
 
         # C) Overlap check for tile[0] and tile[1]
         if len(citygml_objs) >= 2:
-            bbox0 = [citygml_objs[0].matrix_world @ mathutils.Vector(corner) for corner in citygml_objs[0].bound_box]
-            bbox1 = [citygml_objs[1].matrix_world @ mathutils.Vector(corner) for corner in citygml_objs[1].bound_box]
-            min0 = (round(min(v.x for v in bbox0), 3), round(min(v.y for v in bbox0), 3))
-            max0 = (round(max(v.x for v in bbox0), 3), round(max(v.y for v in bbox0), 3))
-            min1 = (round(min(v.x for v in bbox1), 3), round(min(v.y for v in bbox1), 3))
-            max1 = (round(max(v.x for v in bbox1), 3), round(max(v.y for v in bbox1), 3))
+            min0, max0 = _world_bbox(citygml_objs[0])[:2]
+            min1, max1 = _world_bbox(citygml_objs[1])[:2]
             identical = (min0 == min1 and max0 == max1)
             nearly = (abs(min0[0] - min1[0]) < 0.01 and abs(min0[1] - min1[1]) < 0.01 and abs(max0[0] - max1[0]) < 0.01 and abs(max0[1] - max1[1]) < 0.01)
             wo_log += f"C) Overlap check:\n  tile[0] bbox_xy=({min0}, {max0})\n  tile[1] bbox_xy=({min1}, {max1})\n  IDENTICAL={identical}, NEARLY={nearly}\n"
@@ -4815,6 +5488,13 @@ def _run_citygml_import(s):
     s.status_citygml_tiles = tile_count
     s.step1_citygml_tiles = tile_count
     s.step1_citygml_done = ok
+
+    # WORLD_ORIGIN bounds are write-once and settled once the importer returns, so a
+    # single lookup serves both the XY validation and the spatial diagnostics below.
+    try:
+        world_minmax = get_world_origin_minmax()
+    except Exception:
+        world_minmax = (None, None, None, None)
     
     # PATCH 4: Assign default material to CityGML tiles if not already materialized
     if ok:
@@ -4858,7 +5538,7 @@ def _run_citygml_import(s):
         # DECISION: The importer is authoritative. Do NOT subtract WORLD_MIN here.
         # This block now only validates that imported tiles are in correct local range.
         try:
-            min_e, min_n, _, _ = get_world_origin_minmax()
+            min_e, min_n, _, _ = world_minmax
             if min_e is not None and min_n is not None:
                 mesh_objs = [o for o in target_col.objects if o.type == "MESH"]
                 if mesh_objs:
@@ -4903,9 +5583,8 @@ def _run_citygml_import(s):
     
     # === SPATIAL DIAGNOSTICS ===
     try:
-        import math
         # 1) WORLD_ORIGIN values
-        min_e, min_n, max_e, max_n = get_world_origin_minmax()
+        min_e, min_n, max_e, max_n = world_minmax
         crs = get_scene_crs() if 'get_scene_crs' in globals() else 'unknown'
 
         # 2) DEM — use SAME lookup as terrain_validation (single truth source)
@@ -4917,48 +5596,42 @@ def _run_citygml_import(s):
             dem_obj = bpy.data.objects.get('dem_merged')  # legacy fallback
         if dem_obj:
             dem_loc = tuple(round(v, 3) for v in dem_obj.location)
-            dem_bbox = [tuple(round(v, 3) for v in dem_obj.matrix_world @ mathutils.Vector(corner)) for corner in dem_obj.bound_box]
-            dem_bbox_min = (min(v[0] for v in dem_bbox), min(v[1] for v in dem_bbox))
-            dem_bbox_max = (max(v[0] for v in dem_bbox), max(v[1] for v in dem_bbox))
-            dem_bbox_size = (dem_bbox_max[0] - dem_bbox_min[0], dem_bbox_max[1] - dem_bbox_min[1])
-            dem_bbox_center = ((dem_bbox_min[0] + dem_bbox_max[0]) / 2, (dem_bbox_min[1] + dem_bbox_max[1]) / 2)
+            dem_bbox_min, dem_bbox_max, dem_bbox_center, dem_bbox_size = _world_bbox(dem_obj)
         else:
-            dem_loc = dem_bbox = dem_bbox_min = dem_bbox_max = dem_bbox_size = dem_bbox_center = None
+            dem_loc = dem_bbox_min = dem_bbox_max = dem_bbox_size = dem_bbox_center = None
 
         # 3) One sample CityGML tile
         citygml_objs = [o for o in bpy.data.collections.get('CITYGML_TILES', []).objects if o.type == 'MESH'] if bpy.data.collections.get('CITYGML_TILES') else []
         citygml_obj = citygml_objs[0] if citygml_objs else None
         if citygml_obj:
             citygml_loc = tuple(round(v, 3) for v in citygml_obj.location)
-            citygml_bbox = [tuple(round(v, 3) for v in citygml_obj.matrix_world @ mathutils.Vector(corner)) for corner in citygml_obj.bound_box]
-            citygml_bbox_min = (min(v[0] for v in citygml_bbox), min(v[1] for v in citygml_bbox))
-            citygml_bbox_max = (max(v[0] for v in citygml_bbox), max(v[1] for v in citygml_bbox))
-            citygml_bbox_size = (citygml_bbox_max[0] - citygml_bbox_min[0], citygml_bbox_max[1] - citygml_bbox_min[1])
-            citygml_bbox_center = ((citygml_bbox_min[0] + citygml_bbox_max[0]) / 2, (citygml_bbox_min[1] + citygml_bbox_max[1]) / 2)
+            citygml_bbox_min, citygml_bbox_max, citygml_bbox_center, citygml_bbox_size = _world_bbox(citygml_obj)
         else:
-            citygml_loc = citygml_bbox = citygml_bbox_min = citygml_bbox_max = citygml_bbox_size = citygml_bbox_center = None
+            citygml_loc = citygml_bbox_min = citygml_bbox_max = citygml_bbox_size = citygml_bbox_center = None
 
         # 4) Derived check: intersection and center distance
         intersection_xy = False
         center_distance_xy = None
         if dem_bbox_min and dem_bbox_max and citygml_bbox_min and citygml_bbox_max:
-            # Check intersection in X/Y
-            ix = not (dem_bbox_max[0] < citygml_bbox_min[0] or dem_bbox_min[0] > citygml_bbox_max[0])
-            iy = not (dem_bbox_max[1] < citygml_bbox_min[1] or dem_bbox_min[1] > citygml_bbox_max[1])
-            intersection_xy = ix and iy
+            # X/Y boxes intersect iff the overlap interval is non-empty on both axes
+            lo = np.maximum(dem_bbox_min, citygml_bbox_min)
+            hi = np.minimum(dem_bbox_max, citygml_bbox_max)
+            intersection_xy = bool((hi >= lo).all())
             # Center distance
-            dx = dem_bbox_center[0] - citygml_bbox_center[0]
-            dy = dem_bbox_center[1] - citygml_bbox_center[1]
-            center_distance_xy = round(math.sqrt(dx*dx + dy*dy), 3)
+            d = np.subtract(dem_bbox_center, citygml_bbox_center)
+            center_distance_xy = round(float(np.hypot(d[0], d[1])), 3)
 
         # Print diagnostics
-        log_info("[SPATIAL_DIAG]\n" +
-            f"WORLD_ORIGIN: min_e={min_e}, min_n={min_n}, crs={crs}\n" +
-            (f"DEM: loc={dem_loc}, bbox=({dem_bbox_min}, {dem_bbox_max}), size={dem_bbox_size}\n" if dem_obj else "DEM: not found\n") +
-            (f"CITYGML: name={citygml_obj.name if citygml_obj else None}, loc={citygml_loc}, bbox=({citygml_bbox_min}, {citygml_bbox_max}), size={citygml_bbox_size}\n" if citygml_obj else "CITYGML: not found\n") +
-            f"INTERSECTION_XY: {'YES' if intersection_xy else 'NO'}\n" +
-            (f"CENTER_DISTANCE_XY: {center_distance_xy} meters" if center_distance_xy is not None else "")
-        )
+        parts = [
+            "[SPATIAL_DIAG]",
+            f"WORLD_ORIGIN: min_e={min_e}, min_n={min_n}, crs={crs}",
+            f"DEM: loc={dem_loc}, bbox=({dem_bbox_min}, {dem_bbox_max}), size={dem_bbox_size}" if dem_obj else "DEM: not found",
+            f"CITYGML: name={citygml_obj.name}, loc={citygml_loc}, bbox=({citygml_bbox_min}, {citygml_bbox_max}), size={citygml_bbox_size}" if citygml_obj else "CITYGML: not found",
+            f"INTERSECTION_XY: {'YES' if intersection_xy else 'NO'}",
+        ]
+        if center_distance_xy is not None:
+            parts.append(f"CENTER_DISTANCE_XY: {center_distance_xy} meters")
+        log_info("\n".join(parts))
     except Exception as ex:
         log_warn(f"[SPATIAL_DIAG] Failed to compute diagnostics: {ex}")
     # === END SPATIAL DIAGNOSTICS ===
@@ -4967,7 +5640,6 @@ def _run_citygml_import(s):
 
 def _load_gpkg_and_link(s, table_hint="osm_multipolygons"):
     try:
-        from .utils.common import resolve_gpkg_path, log_gpkg_resolution
         resolved, info = resolve_gpkg_path(getattr(s, "gpkg_path", ""))
         log_gpkg_resolution(getattr(s, "gpkg_path", ""), resolved, info, prefix="[Link][GPKG]")
         if resolved and resolved != getattr(s, "gpkg_path", ""):
@@ -5074,53 +5746,48 @@ def _link_gpkg_to_citygml(s):
         log_info(f"[Link][Artifacts] file exists: {link_db.exists()} size={link_db.stat().st_size if link_db.exists() else 0}")
 
         # Count linked buildings from link database
-        import sqlite3
         linked_count = 0
         confidences = []
         tiles_count = 0
 
         if link_db.exists():
             try:
-                conn = sqlite3.connect(str(link_db))
-                cur = conn.cursor()
-
-                # Count links with confidence scores
-                cur.execute("SELECT COUNT(*), AVG(COALESCE(confidence, 0.0)) FROM gml_osm_links")
-                row = cur.fetchone()
-                linked_count = row[0] if row else 0
-                avg_conf = row[1] if row and row[1] else 0.0
-
-                # Get confidence distribution
-                cur.execute("SELECT confidence FROM gml_osm_links WHERE confidence IS NOT NULL")
-                confidences = [r[0] for r in cur.fetchall()]
+                # ensure_link_dbs has finished writing the link DB, so an
+                # immutable read-only handle is safe for the stats pass.
+                with closing(_open_ro(link_db_str, immutable=True)) as conn:
+                    cur = conn.cursor()
+                    cols = {r[1] for r in cur.execute("PRAGMA table_info('gml_osm_links');").fetchall()}
 
-                # Count distinct tiles (gml_osm_links table has source_tile column)
-                try:
-                    cur.execute("SELECT COUNT(DISTINCT source_tile) FROM gml_osm_links")
-                    tiles_row = cur.fetchone()
-                    tiles_count = tiles_row[0] if tiles_row else 0
-                except Exception:
-                    tiles_count = 0
+                    # One scan for every summary aggregate; optional columns are
+                    # folded in only when present, and the "> 0" filters move
+                    # into CASE so AVG/MIN/MAX skip them as NULLs.
+                    aggs = ["COUNT(*)", "AVG(COALESCE(confidence, 0.0))"]
+                    aggs.append("COUNT(DISTINCT source_tile)" if "source_tile" in cols else "0")
+                    for col in ("dist_m", "iou"):
+                        if col in cols:
+                            pos = f"CASE WHEN {col} > 0 THEN {col} END"
+                            aggs += [f"AVG({pos})", f"MIN({pos})", f"MAX({pos})"]
+                        else:
+                            aggs += ["NULL", "NULL", "NULL"]
+                    row = cur.execute(f"SELECT {', '.join(aggs)} FROM gml_osm_links").fetchone()
+                    linked_count = row[0] or 0
+                    avg_conf = row[1] or 0.0
+                    tiles_count = row[2] or 0
+                    drow, irow = row[3:6], row[6:9]
+
+                    # Raw values are still returned: callers derive min/max/median
+                    # and report the sample count from them.
+                    confidences = [c for (c,) in cur.execute(
+                        "SELECT confidence FROM gml_osm_links WHERE confidence IS NOT NULL"
+                    )]
 
                 # ── ACCEPTANCE LOGGING: Distance & IoU stats ──
                 dist_stats_msg = ""
                 iou_stats_msg = ""
-                try:
-                    cols = {r[1] for r in cur.execute("PRAGMA table_info('gml_osm_links');").fetchall()}
-                    if "dist_m" in cols:
-                        cur.execute("SELECT AVG(dist_m), MIN(dist_m), MAX(dist_m) FROM gml_osm_links WHERE dist_m IS NOT NULL AND dist_m > 0")
-                        drow = cur.fetchone()
-                        if drow and drow[0] is not None:
-                            dist_stats_msg = f"[LINKING] avg distance {drow[0]:.1f}m, min {drow[1]:.1f}m, max {drow[2]:.1f}m"
-                    if "iou" in cols:
-                        cur.execute("SELECT AVG(iou), MIN(iou), MAX(iou) FROM gml_osm_links WHERE iou IS NOT NULL AND iou > 0")
-                        irow = cur.fetchone()
-                        if irow and irow[0] is not None:
-                            iou_stats_msg = f"[LINKING] avg IoU {irow[0]:.3f}, min {irow[1]:.3f}, max {irow[2]:.3f}"
-                except Exception:
-                    pass
-
-                conn.close()
+                if drow[0] is not None:
+                    dist_stats_msg = f"[LINKING] avg distance {drow[0]:.1f}m, min {drow[1]:.1f}m, max {drow[2]:.1f}m"
+                if irow[0] is not None:
+                    iou_stats_msg = f"[LINKING] avg IoU {irow[0]:.3f}, min {irow[1]:.3f}, max {irow[2]:.3f}"
 
                 # ── UX: Rich linking summary ──
                 log_info("=" * 50)
@@ -43,6 +43,8 @@ CODE_KEYS = [
 # In-memory encoding caches (separate from Blender cache for non-Blender use)
 _ENCODE_CACHE = {}  # {attr_name_code: {value: code, ...}}
 _DECODE_CACHE = {}  # {attr_name_code: {code: value, ...}}
+_ENCODE_LOWER_CACHE = {}  # {attr_name_code: (source_dict, source_len, {value.lower(): code, ...})}
+_ENCODE_BYTES_CACHE = {}  # {attr_name_code: (source_dict, source_len, {value.encode(): code, ...})}
 
 # Tile ID mapping (source_tile string -> tile_id int)
 _TILE_ID_MAP = {}  # {source_tile_normalized: tile_id}
@@ -653,6 +655,8 @@ def init_legend_caches(legends_dir, table_name):
             # Store in caches
             _ENCODE_CACHE[attr_name_code] = value_to_code
             _DECODE_CACHE[attr_name_code] = code_to_value
+            _ENCODE_LOWER_CACHE.pop(attr_name_code, None)
+            _ENCODE_BYTES_CACHE.pop(attr_name_code, None)
             loaded_count += 1
 
         except Exception as ex:
@@ -729,6 +733,69 @@ def legend_decode(attr_name_code: str, code: int) -> str:
     return cache.get(code, "")
 
 
+def _lower_index(attr_name_code: str):
+    """
+    Return a lowercase value -> code mirror of _ENCODE_CACHE[attr_name_code].
+
+    Built lazily once per cache and rebuilt when the underlying dict is replaced
+    or grows.
+    First match wins on case collisions (same as the former linear scan).
+    """
+    cache = _ENCODE_CACHE.get(attr_name_code)
+    if cache is None:
+        return None
+    entry = _ENCODE_LOWER_CACHE.get(attr_name_code)
+    if entry is not None and entry[0] is cache and entry[1] == len(cache):
+        return entry[2]
+    lower_map = {}
+    for key, code in cache.items():
+        lower_map.setdefault(key.lower(), code)
+    _ENCODE_LOWER_CACHE[attr_name_code] = (cache, len(cache), lower_map)
+    return lower_map
+
+
+def _bytes_index(attr_name_code: str):
+    """
+    Return a UTF-8 bytes -> code mirror of _ENCODE_CACHE[attr_name_code].
+
+    Lets callers holding raw Blender STRING bytes resolve codes without decoding.
+    Only entries a decoded lookup resolves identically are mirrored: nonzero
+    codes whose value is already stripped and is neither "None" nor a "b'...'"
+    repr. Anything else misses here and takes the decode path.
+    Built lazily once per cache and rebuilt when the underlying dict is replaced
+    or grows.
+    """
+    cache = _ENCODE_CACHE.get(attr_name_code)
+    if cache is None:
+        return None
+    entry = _ENCODE_BYTES_CACHE.get(attr_name_code)
+    if entry is not None and entry[0] is cache and entry[1] == len(cache):
+        return entry[2]
+    bytes_map = {}
+    for key, code in cache.items():
+        if (code and isinstance(key, str) and key and key == key.strip()
+                and key != "None" and not key.startswith(("b'", 'b"'))):
+            bytes_map[key.encode("utf-8")] = code
+    _ENCODE_BYTES_CACHE[attr_name_code] = (cache, len(cache), bytes_map)
+    return bytes_map
+
+
+def legend_encode_casefold(attr_name_code: str, value: str) -> int:
+    """
+    Like legend_encode(), but falls back to a case-insensitive lookup on miss.
+
+    Returns:
+        int: Integer code (0 for NULL/empty/missing)
+    """
+    code = legend_encode(attr_name_code, value)
+    if code or not isinstance(value, str):
+        return code
+    lower_map = _lower_index(attr_name_code)
+    if not lower_map:
+        return 0
+    return lower_map.get(value.strip().lower(), 0)
+
+
 def resolve_text_to_code(attr_name_code: str, text_value: str) -> int:
     """
     Return code for decoded text (for Inspector text filter).
@@ -747,16 +814,12 @@ def resolve_text_to_code(attr_name_code: str, text_value: str) -> int:
     if not v:
         return -1
 
-    cache = _ENCODE_CACHE.get(attr_name_code)
-    if cache is None:
-        return -1
-
     # Case-insensitive search
-    for key, code in cache.items():
-        if key.lower() == v:
-            return code
+    lower_map = _lower_index(attr_name_code)
+    if lower_map is None:
+        return -1
 
-    return -1
+    return lower_map.get(v, -1)
 
 
 def legend_export_csv(output_path: str) -> int:
@@ -86,6 +86,11 @@ def dist2(ax: float, ay: float, bx: float, by: float) -> float:
     return dx * dx + dy * dy
 
 
+# 3x3 neighbor cells around a grid key, in the probe order the matcher relies on
+# (first-found wins on equal distance)
+NEIGHBOR_OFFSETS = tuple((dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1))
+
+
 def is_verbose_debug() -> bool:
     """
     [PHASE 13] Check if verbose debug mode is active.
@@ -350,22 +355,24 @@ def main(min_e: float = 0.0, min_n: float = 0.0):
             best_d2 = None
             best_osm_bbox = (None, None, None, None)
 
-            # search in neighbor cells (3x3 is usually enough when cell ~= radius)
-            for dx_cell in (-1, 0, 1):
-                for dy_cell in (-1, 0, 1):
-                    cell = (gk[0] + dx_cell, gk[1] + dy_cell)
-                    pts = grid.get(cell)
-                    if not pts:
-                        continue
-                    for pt in pts:
-                        osm_way_id, ox, oy = pt[0], pt[1], pt[2]
-                        d2_val = dist2(gx, gy, ox, oy)
-                        if d2_val <= r2 and (best_d2 is None or d2_val < best_d2):
-                            best_d2 = d2_val
-                            best_id = osm_way_id
-                            best_cx = ox
-                            best_cy = oy
-                            best_osm_bbox = (pt[3], pt[4], pt[5], pt[6]) if len(pt) >= 7 else (None, None, None, None)
+            # search in neighbor cells (3x3 is usually enough when cell ~= radius);
+            # distance inlined and the best row kept as-is, unpacked once after the scan
+            gkx, gky = gk
+            best_pt = None
+            for dx_cell, dy_cell in NEIGHBOR_OFFSETS:
+                pts = grid.get((gkx + dx_cell, gky + dy_cell))
+                if not pts:
+                    continue
+                for pt in pts:
+                    ddx = gx - pt[1]
+                    ddy = gy - pt[2]
+                    d2_val = ddx * ddx + ddy * ddy
+                    if d2_val <= r2 and (best_d2 is None or d2_val < best_d2):
+                        best_d2 = d2_val
+                        best_pt = pt
+            if best_pt is not None:
+                best_id, best_cx, best_cy = best_pt[0], best_pt[1], best_pt[2]
+                best_osm_bbox = best_pt[3:7] if len(best_pt) >= 7 else (None, None, None, None)
 
             if best_id is None:
                 # no match
@@ -732,7 +732,7 @@ class M1DCSettings(PropertyGroup):
     )
     inspector_query_last_stats_json: StringProperty(
         name="Last Query Stats JSON",
-        description="JSON-encoded statistics from last query",
+        description="JSON-encoded statistics from last query (written when the file is saved)",
         default="",
         options={"HIDDEN"},
     )
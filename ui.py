@@ -586,12 +586,9 @@ class M1DC_PT_Pipeline(Panel):
 
             # Show detailed stats table if query succeeded
             if query_active:
-                stats_json = getattr(s, "inspector_query_last_stats_json", "")
-                if stats_json:
+                stats = ops._get_inspector_stats(s)
+                if stats:
                     try:
-                        import json
-                        stats = json.loads(stats_json)
-
                         result_box = query_box.box()
                         result_box.label(text="Query Results:", icon="PRESET")
 
@@ -625,7 +622,7 @@ class M1DC_PT_Pipeline(Panel):
                                     id_row.label(text=str(osm_id))
 
                     except Exception:
-                        pass  # Silently ignore JSON parse errors
+                        pass  # Silently ignore malformed stats
 
             # ================================================================
             # SQL QUERY RESULTS TABLE (directly below SQL controls)